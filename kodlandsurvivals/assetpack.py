@@ -0,0 +1,170 @@
+"""Pacote de sprites pré-processados, lido com mmap
+
+    python assetpack.py            # gera images/sprites.pack a partir dos PNGs
+
+O pacote guarda, para cada entrada de PACKED_SPRITES do main.py, os pixels
+já escalados (e recortados/girados, quando pedido) em BGRA, mais um
+manifesto JSON. No jogo, AssetPack.open() mapeia o arquivo e cria as
+superfícies direto sobre a memória mapeada, sem decodificar PNG nem escalar.
+Se algum PNG mudar depois do build, o pacote é ignorado até ser refeito.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+
+import pygame
+
+MAGIC = b"KSPK"
+VERSION = 1
+PIXEL_FORMAT = "BGRA"  # mesma ordem do convert_alpha() nas telas de 32 bits
+_HEADER = struct.Struct("<4sII")  # magic, versão, tamanho do manifesto
+
+
+def sprite_key(name, scale):
+    return f"{name}@{scale!r}"
+
+
+def rotation_key(name, scale, steps, crop):
+    return f"{name}@{scale!r}@{steps}@{int(bool(crop))}"
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class AssetPack:
+    """Pacote aberto: as superfícies apontam para o arquivo mapeado
+
+    O mmap fica aberto enquanto o pacote existir, porque as superfícies
+    usam a memória dele sem copiar.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, manifest_size = _HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} não é um pacote de sprites válido (versão {VERSION})")
+        start = _HEADER.size
+        self.manifest = json.loads(bytes(self._map[start:start + manifest_size]))
+        self._data = memoryview(self._map)[start + manifest_size:]
+
+    @classmethod
+    def open(cls, path, root="images"):
+        """Abre o pacote; devolve None se ele não existir ou estiver desatualizado"""
+        if not os.path.exists(path):
+            return None
+        try:
+            pack = cls(path)
+        except (OSError, ValueError) as e:
+            print(f"AVISO: {e} - usando os PNGs")
+            return None
+        if pack.is_stale(root):
+            print(f"AVISO: {os.path.basename(path)} desatualizado - rode python assetpack.py")
+            pack.close()
+            return None
+        return pack
+
+    def is_stale(self, root):
+        for name, stamp in self.manifest["sources"].items():
+            path = os.path.join(root, name)
+            if not os.path.exists(path) or _source_stamp(path) != stamp:
+                return True
+        return False
+
+    def _surface(self, entry):
+        offset, width, height = entry
+        pixels = self._data[offset:offset + width * height * 4]
+        return pygame.image.frombuffer(pixels, (width, height), PIXEL_FORMAT)
+
+    def has(self, name):
+        return name in self.manifest["sources"]
+
+    def sprite(self, name, scale=1.0):
+        entry = self.manifest["sprites"].get(sprite_key(name, scale))
+        return self._surface(entry) if entry is not None else None
+
+    def rotations(self, name, scale, steps, crop=False):
+        """(superfície base, [quadros]) ou None se essa rotação não foi gerada"""
+        entry = self.manifest["rotations"].get(rotation_key(name, scale, steps, crop))
+        if entry is None:
+            return None
+        return self._surface(entry["base"]), [self._surface(frame) for frame in entry["frames"]]
+
+    def close(self):
+        self._data = None
+        try:
+            self._map.close()
+        except BufferError:
+            # Ainda há superfícies usando a memória; o sistema fecha ao sair
+            pass
+        self._file.close()
+
+
+class _PackWriter:
+    def __init__(self):
+        self.blob = bytearray()
+
+    def add(self, surf):
+        width, height = surf.get_size()
+        offset = len(self.blob)
+        self.blob += pygame.image.tobytes(surf, PIXEL_FORMAT)
+        return [offset, width, height]
+
+
+def build(entries, root="images", path=None):
+    """Gera o pacote; `entries` = [(imagem, escala, recorte, passos de rotação)]"""
+    from assets import AssetCache
+
+    path = path or os.path.join(root, "sprites.pack")
+    cache = AssetCache(root)
+    writer = _PackWriter()
+    manifest = {"sources": {}, "sprites": {}, "rotations": {}}
+
+    for name, scale, crop, steps in entries:
+        source = os.path.join(root, name)
+        if not os.path.exists(source):
+            print(f"AVISO: {name} não encontrado - fora do pacote")
+            continue
+        manifest["sources"][name] = _source_stamp(source)
+        if steps:
+            rotations = cache.rotations(name, scale, steps, steps, crop)
+            rotations.prebake()
+            manifest["rotations"][rotation_key(name, scale, steps, crop)] = {
+                "base": writer.add(rotations.surf),
+                "frames": [writer.add(rotations.get(index * 360.0 / steps)) for index in range(steps)],
+            }
+        else:
+            manifest["sprites"][sprite_key(name, scale)] = writer.add(cache.sprite(name, scale).surf)
+
+    data = json.dumps(manifest, separators=(",", ":")).encode()
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(data)))
+        f.write(data)
+        f.write(writer.blob)
+    return path, len(manifest["sprites"]), len(manifest["rotations"]), len(writer.blob)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera o pacote de sprites do Kodland Survival")
+    parser.add_argument("--output", help="arquivo de saída (padrão: o ASSET_PACK do main.py)")
+    args = parser.parse_args(argv)
+
+    import headless
+
+    mod = headless.load_game_module()
+    path = args.output or mod.ASSET_PACK
+    path, sprites, rotations, size = build(mod.PACKED_SPRITES, mod.ASSETS.root, path)
+    print(f"Pacote salvo em {path}: {sprites} sprites, {rotations} rotações, "
+          f"{size / 1024 / 1024:.1f} MB de pixels")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
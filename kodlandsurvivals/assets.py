@@ -0,0 +1,172 @@
+import os
+from collections import OrderedDict, namedtuple
+
+import pygame
+
+
+# Superfície já escalada + máscara de colisão. As instâncias são compartilhadas
+# entre todas as entidades, então ninguém deve desenhar por cima de `surf`.
+SpriteAsset = namedtuple("SpriteAsset", ["surf", "mask", "width", "height"])
+
+
+class RotationCache:
+    """Rotações pré-calculadas de uma superfície, quantizadas em `steps` ângulos
+
+    Só as `max_entries` rotações usadas mais recentemente ficam em memória.
+    """
+
+    def __init__(self, surf, steps=360, max_entries=256, frames=None):
+        self.surf = surf
+        self.steps = steps
+        self.max_entries = max_entries
+        self._frames = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if frames is not None:
+            # Quadros prontos (do pacote de sprites): todos ficam em memória
+            self.max_entries = max(max_entries, len(frames))
+            self._frames.update(enumerate(frames))
+
+    def bucket(self, angle):
+        return int(round(angle * self.steps / 360.0)) % self.steps
+
+    def get(self, angle):
+        index = self.bucket(angle)
+        frame = self._frames.get(index)
+        if frame is not None:
+            self.hits += 1
+            self._frames.move_to_end(index)
+            return frame
+
+        self.misses += 1
+        frame = pygame.transform.rotate(self.surf, index * 360.0 / self.steps)
+        self._frames[index] = frame
+        if len(self._frames) > self.max_entries:
+            self._frames.popitem(last=False)
+        return frame
+
+    def prebake(self):
+        """Gera todas as rotações de uma vez (útil antes da partida começar)"""
+        for index in range(min(self.steps, self.max_entries)):
+            self.get(index * 360.0 / self.steps)
+
+    def __len__(self):
+        return len(self._frames)
+
+
+class AssetCache:
+    """Carrega, escala e gera a máscara de cada imagem uma única vez
+
+    Com um AssetPack (assetpack.py), o que estiver no pacote vem pronto de
+    lá e só o resto cai na leitura dos PNGs.
+    """
+
+    def __init__(self, root="images", pack=None):
+        self.root = root
+        self.pack = pack
+        self._exists = {}
+        self._images = {}
+        self._sprites = {}
+        self._rotations = {}
+        self.hits = 0
+        self.misses = 0
+
+    def image(self, name):
+        """Imagem original (sem escala) ou None se o arquivo não existir"""
+        if name in self._images:
+            self.hits += 1
+            return self._images[name]
+
+        self.misses += 1
+        return self.add_image(name, self.load(name))
+
+    def has(self, name):
+        """Se a imagem existe (no pacote ou em disco), sem decodificar nada"""
+        if self.pack is not None and self.pack.has(name):
+            return True
+        if name not in self._exists:
+            self._exists[name] = os.path.exists(os.path.join(self.root, name))
+        return self._exists[name]
+
+    def load(self, name):
+        """Só lê o arquivo, sem converter: pode rodar fora da thread principal"""
+        if self.pack is not None:
+            surf = self.pack.sprite(name, 1.0)
+            if surf is not None:
+                return surf
+        path = os.path.join(self.root, name)
+        if os.path.exists(path):
+            return pygame.image.load(path)
+        return None
+
+    def add_image(self, name, image):
+        """Guarda uma imagem lida por load() (o convert_alpha é feito aqui)"""
+        if image is not None:
+            image = image.convert_alpha()
+        else:
+            print(f"AVISO: {name} não encontrado - usando fallback")
+        self._images[name] = image
+        return image
+
+    def sprite(self, name, scale=1.0, fallback_size=(10, 10), fallback_color=(255, 0, 255)):
+        key = (name, scale)
+        asset = self._sprites.get(key)
+        if asset is not None:
+            self.hits += 1
+            return asset
+
+        self.misses += 1
+        surf = self.pack.sprite(name, scale) if self.pack is not None else None
+        if surf is None:
+            image = self.image(name)
+            if image is not None:
+                size = (int(image.get_width() * scale), int(image.get_height() * scale))
+                surf = pygame.transform.scale(image, size)
+
+        if surf is not None:
+            mask = pygame.mask.from_surface(surf)
+        else:
+            # Fallback sem máscara: as colisões caem no teste por retângulo
+            surf = pygame.Surface((int(fallback_size[0]), int(fallback_size[1])), pygame.SRCALPHA)
+            surf.fill(fallback_color)
+            mask = None
+
+        asset = SpriteAsset(surf, mask, surf.get_width(), surf.get_height())
+        self._sprites[key] = asset
+        return asset
+
+    def rotations(self, name, scale=1.0, steps=360, max_entries=256, crop=False):
+        """RotationCache compartilhado, gerado a partir do sprite já escalado
+
+        Com `crop`, as bordas transparentes são cortadas antes de girar.
+        """
+        key = (name, scale, steps, crop)
+        cache = self._rotations.get(key)
+        if cache is None and self.pack is not None:
+            packed = self.pack.rotations(name, scale, steps, crop)
+            if packed is not None:
+                cache = RotationCache(packed[0], steps, max_entries, frames=packed[1])
+                self._rotations[key] = cache
+        if cache is None:
+            surf = self.sprite(name, scale).surf
+            if crop:
+                surf = surf.subsurface(surf.get_bounding_rect()).copy()
+            cache = RotationCache(surf, steps, max_entries)
+            self._rotations[key] = cache
+        return cache
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "images": len(self._images),
+            "sprites": len(self._sprites),
+            "rotations": sum(len(cache) for cache in self._rotations.values()),
+        }
+
+    def clear(self):
+        self._images.clear()
+        self._sprites.clear()
+        self._rotations.clear()
+        self.hits = 0
+        self.misses = 0
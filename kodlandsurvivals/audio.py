@@ -0,0 +1,90 @@
+import time
+
+import pygame
+
+
+class VoiceManager:
+    """Canais do mixer reservados por categoria de som
+
+    Cada categoria tem um número fixo de canais (vozes). Quando todas estão
+    ocupadas, a voz mais antiga da categoria é roubada (ou o som é
+    descartado, com steal=False). O mesmo som disparado de novo dentro de
+    `coalesce_window` segundos é juntado ao anterior em vez de tocar outra vez.
+    """
+
+    def __init__(self, groups, coalesce_window=0.05, steal=True, clock=time.perf_counter):
+        self.coalesce_window = coalesce_window
+        self.steal = steal
+        self.clock = clock
+        self.enabled = pygame.mixer.get_init() is not None
+        self.channels = {}
+        self._started = {}
+        self._categories = {}
+        self._last_played = {}
+        self.stats = {
+            category: {"played": 0, "coalesced": 0, "stolen": 0, "dropped": 0}
+            for category in groups
+        }
+        if not self.enabled:
+            return
+
+        total = sum(groups.values())
+        if pygame.mixer.get_num_channels() < total:
+            pygame.mixer.set_num_channels(total)
+        # Reservados: Sound.play() solto não pega os canais das categorias
+        pygame.mixer.set_reserved(total)
+        index = 0
+        for category, count in groups.items():
+            self.channels[category] = [pygame.mixer.Channel(index + i) for i in range(count)]
+            index += count
+
+    def register(self, sound, category):
+        if sound is not None:
+            self._categories[sound] = category
+
+    def play(self, sound, category=None):
+        """Toca o som no grupo dele; devolve o canal usado ou None"""
+        if not self.enabled or sound is None:
+            return None
+        category = category or self._categories.get(sound)
+        channels = self.channels.get(category)
+        if not channels:
+            return None
+
+        stats = self.stats[category]
+        now = self.clock()
+        last = self._last_played.get(sound)
+        if last is not None and now - last < self.coalesce_window:
+            stats["coalesced"] += 1
+            return None
+
+        channel = None
+        for candidate in channels:
+            if not candidate.get_busy():
+                channel = candidate
+                break
+        if channel is None:
+            if not self.steal:
+                stats["dropped"] += 1
+                return None
+            channel = min(channels, key=lambda c: self._started.get(c, 0.0))
+            stats["stolen"] += 1
+
+        channel.play(sound)
+        self._started[channel] = now
+        self._last_played[sound] = now
+        stats["played"] += 1
+        return channel
+
+    def active(self):
+        return sum(channel.get_busy() for channels in self.channels.values() for channel in channels)
+
+    def stop(self):
+        for channels in self.channels.values():
+            for channel in channels:
+                channel.stop()
+
+    def reset_stats(self):
+        for stats in self.stats.values():
+            for name in stats:
+                stats[name] = 0
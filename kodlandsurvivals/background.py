@@ -0,0 +1,123 @@
+import math
+from collections import OrderedDict
+
+import pygame
+
+
+class ChunkLayer:
+    """Desenho comum a fundos feitos de pedaços: as subclasses dão o visible()"""
+
+    def visible(self, offset_x, offset_y, width, height):
+        """[(pedaço, posição na tela)] dos pedaços que cruzam a tela; aqui, nenhum"""
+        return []
+
+    def draw(self, surface, offset_x, offset_y):
+        width, height = surface.get_size()
+        surface.blits(self.visible(offset_x, offset_y, width, height), doreturn=False)
+
+    def restore(self, surface, offset_x, offset_y, rects):
+        """Redesenha o fundo só dentro dos retângulos (coordenadas de tela)"""
+        if not rects:
+            return
+        width, height = surface.get_size()
+        jobs = []
+        for chunk, (x, y) in self.visible(offset_x, offset_y, width, height):
+            chunk_rect = chunk.get_rect(topleft=(x, y))
+            for rect in rects:
+                area = chunk_rect.clip(rect)
+                if area.width and area.height:
+                    jobs.append((chunk, area.topleft, area.move(-x, -y)))
+        surface.blits(jobs, doreturn=False)
+
+
+class ChunkedBackground(ChunkLayer):
+    """Fundo repetido pré-montado em pedaços do tamanho da câmera
+
+    Cada pedaço (chunk) cobre uma área fixa do mundo e só é montado na
+    primeira vez que a câmera chega nele; depois desenhar o fundo são no
+    máximo quatro blits, sem o laço sobre os ladrilhos.
+    """
+
+    def __init__(self, tile, chunk_size, max_chunks=9):
+        self.tile = tile
+        self.tile_width, self.tile_height = tile.get_size()
+        self.chunk_width, self.chunk_height = chunk_size
+        self.max_chunks = max_chunks
+        self._chunks = OrderedDict()
+        self.builds = 0
+
+    def _build(self, cx, cy):
+        surf = pygame.Surface((self.chunk_width, self.chunk_height), 0, self.tile)
+        start_x = -((cx * self.chunk_width) % self.tile_width)
+        start_y = -((cy * self.chunk_height) % self.tile_height)
+        for y in range(start_y, self.chunk_height, self.tile_height):
+            for x in range(start_x, self.chunk_width, self.tile_width):
+                surf.blit(self.tile, (x, y))
+        self.builds += 1
+        return surf
+
+    def chunk(self, cx, cy):
+        key = (cx, cy)
+        surf = self._chunks.get(key)
+        if surf is None:
+            surf = self._build(cx, cy)
+            self._chunks[key] = surf
+            if len(self._chunks) > self.max_chunks:
+                self._chunks.popitem(last=False)
+        else:
+            self._chunks.move_to_end(key)
+        return surf
+
+    def visible(self, offset_x, offset_y, width, height):
+        """Pedaços que aparecem na tela: lista de (superfície, posição na tela)"""
+        offset_x = math.floor(offset_x)
+        offset_y = math.floor(offset_y)
+        cx0 = offset_x // self.chunk_width
+        cy0 = offset_y // self.chunk_height
+        cx1 = (offset_x + width - 1) // self.chunk_width
+        cy1 = (offset_y + height - 1) // self.chunk_height
+        return [
+            (self.chunk(cx, cy), (cx * self.chunk_width - offset_x, cy * self.chunk_height - offset_y))
+            for cy in range(cy0, cy1 + 1)
+            for cx in range(cx0, cx1 + 1)
+        ]
+
+
+class DirtyRects:
+    """Lembra onde as coisas foram desenhadas para só limpar essas áreas
+
+    Só vale enquanto a câmera estiver parada: se ela andar (ou o estado do
+    jogo mudar), o próximo frame precisa redesenhar o fundo inteiro.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.previous = []
+        self.current = []
+        self._view = None
+        self.full_redraws = 0
+        self.partial_redraws = 0
+
+    def begin_frame(self, offset_x, offset_y, state):
+        """Devolve True se o frame precisa do fundo inteiro"""
+        view = (math.floor(offset_x), math.floor(offset_y), state)
+        full = not self.enabled or view != self._view
+        self._view = view
+        self.current = []
+        if full:
+            self.previous = []
+            self.full_redraws += 1
+        else:
+            self.partial_redraws += 1
+        return full
+
+    def add(self, rect):
+        if rect is not None:
+            self.current.append(pygame.Rect(rect))
+
+    def end_frame(self):
+        self.previous = self.current
+        self.current = []
+
+    def invalidate(self):
+        self._view = None
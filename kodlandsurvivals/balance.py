@@ -0,0 +1,230 @@
+"""Simulador de balanceamento: muitas partidas de bot em paralelo
+
+    python balance.py --runs 200 --policies random DAMAGE VAMPIRE
+    python balance.py --runs 100 --set ENEMY_HEALTH=40 --set WAVE_HEALTH_SCALING=0.15
+    python balance.py --runs 500 --output resultado.json --stream corridas.jsonl
+
+Cada partida roda num processo do pool com a sua própria semente. As
+estatísticas por wave (duração, kills, dano levado, upgrade escolhido)
+chegam conforme as partidas terminam e são agregadas no final.
+"""
+import argparse
+import ast
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+import headless
+
+
+def parse_override(text):
+    """"NOME=valor" -> (NOME, valor); o valor é lido como literal Python"""
+    name, sep, value = text.partition("=")
+    if not sep or not name.isupper():
+        raise argparse.ArgumentTypeError(f"esperado CONSTANTE=valor, veio {text!r}")
+    try:
+        value = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        pass
+    return name, value
+
+
+def _init_worker(overrides):
+    with contextlib.redirect_stdout(io.StringIO()):
+        mod = headless.load_game_module()
+    for name, value in overrides:
+        if not hasattr(mod, name):
+            raise AttributeError(f"main.py não tem a constante {name}")
+        setattr(mod, name, value)
+
+
+class WaveTracker:
+    """Fecha um registro cada vez que a wave muda ou a partida acaba"""
+
+    def __init__(self, game, dt):
+        self.dt = dt
+        self.waves = []
+        self.picks = []
+        self._open(game, 0)
+
+    def _open(self, game, tick):
+        self.wave = game.wave
+        self.start_tick = tick
+        self.start_kills = game.total_kills
+        self.damage = 0.0
+        self.last_health = game.player.health
+
+    def _close(self, game, tick, completed):
+        self.waves.append({
+            "wave": self.wave,
+            "duration": (tick - self.start_tick) * self.dt,
+            "kills": game.total_kills - self.start_kills,
+            "damage_taken": self.damage,
+            "health": game.player.health,
+            "upgrade": self.picks[-1] if completed and self.picks else None,
+            "completed": completed,
+        })
+
+    def __call__(self, game, tick):
+        health = game.player.health
+        if health < self.last_health:
+            self.damage += self.last_health - health
+        self.last_health = health
+        if game.wave != self.wave:
+            self._close(game, tick, True)
+            self._open(game, tick)
+
+    def finish(self, game, tick):
+        # Parou bem na virada (limite de waves): não sobra wave incompleta
+        if tick > self.start_tick:
+            self._close(game, tick, False)
+
+
+def simulate(task):
+    """Roda uma partida (policy, seed, max_waves, max_ticks) e devolve o registro"""
+    policy, seed, max_waves, max_ticks = task
+    mod = headless.load_game_module()
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = headless.new_game(seed)
+    game.input = headless.BotInput(game, seed, upgrade_policy=policy)
+
+    tracker = WaveTracker(game, game.fixed_dt)
+    apply_upgrade = game.apply_upgrade
+
+    def record_pick(upgrade):
+        tracker.picks.append(upgrade.name)
+        apply_upgrade(upgrade)
+
+    game.apply_upgrade = record_pick
+    stats = headless.run_game(game, max_ticks, max_waves, game.fixed_dt, on_tick=tracker)
+    tracker.finish(game, stats["ticks"])
+    game.shutdown()
+
+    return {
+        "policy": policy,
+        "seed": seed,
+        "wave": stats["wave"],
+        "kills": stats["kills"],
+        "ticks": stats["ticks"],
+        "survival_time": stats["simulated_time"],
+        "game_over": game.state == mod.GameState.GAME_OVER,
+        "wall_time": stats["wall_time"],
+        "waves": tracker.waves,
+        "upgrades": tracker.picks,
+    }
+
+
+def aggregate(runs):
+    """{policy: resumo} com médias por wave e contagem de upgrades"""
+    report = {}
+    for policy in sorted({run["policy"] for run in runs}):
+        selected = [run for run in runs if run["policy"] == policy]
+        by_wave = {}
+        upgrades = {}
+        for run in selected:
+            for record in run["waves"]:
+                by_wave.setdefault(record["wave"], []).append(record)
+            for name in run["upgrades"]:
+                upgrades[name] = upgrades.get(name, 0) + 1
+
+        waves = {}
+        for wave, records in sorted(by_wave.items()):
+            waves[wave] = {
+                "runs": len(records),
+                "completed": sum(record["completed"] for record in records),
+                "duration": statistics.mean(record["duration"] for record in records),
+                "kills": statistics.mean(record["kills"] for record in records),
+                "damage_taken": statistics.mean(record["damage_taken"] for record in records),
+            }
+
+        report[policy] = {
+            "runs": len(selected),
+            "deaths": sum(run["game_over"] for run in selected),
+            "wave_mean": statistics.mean(run["wave"] for run in selected),
+            "wave_max": max(run["wave"] for run in selected),
+            "survival_time": statistics.mean(run["survival_time"] for run in selected),
+            "kills": statistics.mean(run["kills"] for run in selected),
+            "waves": waves,
+            "upgrades": dict(sorted(upgrades.items(), key=lambda item: -item[1])),
+        }
+    return report
+
+
+def print_report(report):
+    for policy, summary in report.items():
+        print(f"\npolicy={policy} corridas={summary['runs']} mortes={summary['deaths']} "
+              f"wave média={summary['wave_mean']:.1f} (máx {summary['wave_max']}) "
+              f"sobrevivência={summary['survival_time']:.0f}s kills={summary['kills']:.0f}")
+        print("wave  corridas  completas  duração(s)  kills  dano")
+        for wave, stats in summary["waves"].items():
+            print(f"{wave:>4}  {stats['runs']:>8}  {stats['completed']:>9}  "
+                  f"{stats['duration']:>10.1f}  {stats['kills']:>5.1f}  {stats['damage_taken']:>5.1f}")
+        total = sum(summary["upgrades"].values())
+        if total:
+            picks = ", ".join(f"{name} {count} ({count * 100 // total}%)"
+                              for name, count in summary["upgrades"].items())
+            print(f"upgrades: {picks}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulador de balanceamento do Kodland Survival")
+    parser.add_argument("--runs", type=int, default=50, help="partidas por policy")
+    parser.add_argument("--seed", type=int, default=0, help="semente da primeira partida")
+    parser.add_argument("--policies", nargs="+", default=["random"],
+                        help="escolha de upgrade do bot: random, 1/2/3 ou nome do UpgradeType")
+    parser.add_argument("--waves", type=int, default=20, help="para ao passar desta wave")
+    parser.add_argument("--ticks", type=int, default=60 * 60 * 20, help="limite de ticks por partida")
+    parser.add_argument("--set", type=parse_override, action="append", default=[],
+                        metavar="CONSTANTE=valor", help="troca uma constante do main.py")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processos")
+    parser.add_argument("--output", help="grava o relatório agregado em JSON")
+    parser.add_argument("--stream", help="grava cada partida como uma linha JSON assim que termina")
+    args = parser.parse_args(argv)
+
+    tasks = [
+        (policy, args.seed + run, args.waves, args.ticks)
+        for policy in args.policies
+        for run in range(args.runs)
+    ]
+    runs = []
+    stream = open(args.stream, "w") if args.stream else None
+    start = time.perf_counter()
+    try:
+        with multiprocessing.Pool(args.workers, _init_worker, (args.set,)) as pool:
+            for done, run in enumerate(pool.imap_unordered(simulate, tasks), 1):
+                runs.append(run)
+                if stream is not None:
+                    stream.write(json.dumps(run) + "\n")
+                    stream.flush()
+                print(f"[{done}/{len(tasks)}] policy={run['policy']} seed={run['seed']} "
+                      f"wave={run['wave']} kills={run['kills']} "
+                      f"{'morreu' if run['game_over'] else 'sobreviveu'}", flush=True)
+            # O SDL trata SIGTERM nos workers, então o terminate() do "with"
+            # não os derruba: fecha a fila e espera cada um sair sozinho
+            pool.close()
+            pool.join()
+    finally:
+        if stream is not None:
+            stream.close()
+    elapsed = time.perf_counter() - start
+
+    report = aggregate(runs)
+    print_report(report)
+    ticks = sum(run["ticks"] for run in runs)
+    print(f"\n{len(runs)} partidas em {elapsed:.1f}s com {args.workers} processos "
+          f"({ticks / elapsed:.0f} ticks/s no total)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"overrides": dict(args.set), "report": report}, f, indent=2)
+        print(f"Relatório salvo em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
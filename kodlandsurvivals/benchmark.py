@@ -0,0 +1,205 @@
+"""Benchmarks do Game com cenários fixos e comparação com uma baseline
+
+    python benchmark.py --save-baseline      # grava benchmark_baseline.json
+    python benchmark.py --tolerance 0.15     # falha se ficar >15% mais lento
+    python benchmark.py --replay partida.ksr # usa uma partida gravada (F5/F6)
+
+Mede ticks/s de Game.tick e frames/s de Game.draw numa superfície fora da
+tela. Sai com código 1 se algum cenário regredir além da tolerância.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import headless
+
+BASELINE_FILE = os.path.join(headless.GAME_DIR, "benchmark_baseline.json")
+GOD_MODE_HEALTH = 10 ** 9
+
+
+def _god_mode(game):
+    # O jogador não pode morrer no meio da medição
+    game.player.max_health = GOD_MODE_HEALTH
+    game.player.health = GOD_MODE_HEALTH
+
+
+def _jump_to_wave(game, wave):
+    game.start_wave(wave)
+    game.flush_spawns()
+
+
+def setup_wave1(game):
+    _god_mode(game)
+    _jump_to_wave(game, 1)
+
+
+def setup_wave20(game):
+    _god_mode(game)
+    _jump_to_wave(game, 20)
+
+
+def setup_max_enemies(game):
+    mod = headless.load_game_module()
+    _god_mode(game)
+    game.player.fire_rate_multiplier = 1.25 ** 8
+    game.player.damage_multiplier = 1.0
+    _jump_to_wave(game, mod.MAX_ENEMIES)
+    while len(game.enemies) < mod.MAX_ENEMIES:
+        game.spawn_wave()
+        game.flush_spawns()
+
+
+def setup_long_survival(game):
+    _god_mode(game)
+    game.player.damage_multiplier = 3.0
+    game.player.fire_rate_multiplier = 2.0
+    _jump_to_wave(game, 1)
+
+
+# nome -> (preparação, ticks, frames)
+SCENARIOS = {
+    "wave1": (setup_wave1, 600, 120),
+    "wave20": (setup_wave20, 600, 120),
+    "max_enemies": (setup_max_enemies, 600, 120),
+    "long_survival": (setup_long_survival, 6000, 120),
+}
+
+
+def run_scenario(name, seed=1234, scale=1.0):
+    """Roda um cenário e devolve {"ticks_per_second", "frames_per_second"}"""
+    import pygame
+
+    mod = headless.load_game_module()
+    setup, ticks, frames = SCENARIOS[name]
+    ticks = max(1, int(ticks * scale))
+    frames = max(1, int(frames * scale))
+
+    random.seed(seed)
+    game = headless.new_game(seed)
+    game.enemy_store.clear()
+    game.enemy_pool.clear()
+    game.spawner.clear()
+    game.wave_in_progress = False
+    setup(game)
+    dt = game.fixed_dt
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        game.input.advance()
+        game.tick(dt)
+    tick_time = time.perf_counter() - start
+
+    headless.attach_screen(mod, pygame.Surface((mod.WIDTH, mod.HEIGHT)))
+    start = time.perf_counter()
+    for _ in range(frames):
+        game.draw()
+    draw_time = time.perf_counter() - start
+    game.shutdown()
+
+    return {
+        "ticks_per_second": ticks / tick_time if tick_time > 0 else 0.0,
+        "frames_per_second": frames / draw_time if draw_time > 0 else 0.0,
+        "enemies": len(game.enemies),
+        "wave": game.wave,
+    }
+
+
+def run_replay(path):
+    """Mede ticks/s refazendo uma partida gravada (sem conferir hashes)"""
+    from replay import ReplayLog, replay
+
+    stats = replay(ReplayLog.load(path), verify=False)
+    return {
+        "ticks_per_second": stats["ticks_per_second"],
+        "enemies": 0,
+        "wave": stats["wave"],
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Lista de (cenário, métrica, atual, baseline) que ficaram abaixo do limite"""
+    regressions = []
+    for name, metrics in results.items():
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        for metric in ("ticks_per_second", "frames_per_second"):
+            if metric not in expected or metric not in metrics:
+                continue
+            if metrics[metric] < expected[metric] * (1.0 - tolerance):
+                regressions.append((name, metric, metrics[metric], expected[metric]))
+    return regressions
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    data = {
+        name: {
+            metric: round(metrics[metric], 1)
+            for metric in ("ticks_per_second", "frames_per_second")
+            if metric in metrics
+        }
+        for name, metrics in results.items()
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do Kodland Survival")
+    parser.add_argument("scenarios", nargs="*", help=f"cenários ({', '.join(SCENARIOS)})")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="arquivo JSON da baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="grava os resultados como baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="queda aceitável (0.15 = 15%%)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplica ticks e frames de cada cenário")
+    parser.add_argument("--replay", action="append", default=[], metavar="ARQUIVO",
+                        help="replay gravado para medir também (pode repetir)")
+    args = parser.parse_args(argv)
+
+    names = args.scenarios or ([] if args.replay else list(SCENARIOS))
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"cenário desconhecido: {', '.join(unknown)}")
+
+    results = {}
+    for name in names:
+        results[name] = run_scenario(name, args.seed, args.scale)
+        metrics = results[name]
+        print(f"{name:<14} {metrics['ticks_per_second']:9.0f} ticks/s "
+              f"{metrics['frames_per_second']:8.0f} frames/s "
+              f"({metrics['enemies']} inimigos, wave {metrics['wave']})")
+    for path in args.replay:
+        name = "replay:" + os.path.basename(path)
+        results[name] = run_replay(path)
+        print(f"{name:<14} {results[name]['ticks_per_second']:9.0f} ticks/s "
+              f"(wave {results[name]['wave']})")
+
+    if args.save_baseline:
+        baseline = load_baseline(args.baseline)
+        save_baseline(args.baseline, {**baseline, **results})
+        print(f"Baseline salva em {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print("AVISO: nenhuma baseline encontrada - rode com --save-baseline")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for name, metric, current, expected in regressions:
+        print(f"REGRESSÃO: {name} {metric} = {current:.0f} (baseline {expected:.0f})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
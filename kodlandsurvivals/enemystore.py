@@ -0,0 +1,350 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class SimulationLOD:
+    """Níveis de detalhe da simulação por distância até o jogador
+
+    Até `near` o inimigo anda todo tick; até `far` anda a cada `mid_every`
+    ticks com o tempo acumulado; além disso só se aproxima em linha reta a
+    cada `far_every` ticks, sem consultar o flow field. Ao mudar de nível o
+    tempo que ficou acumulado é aplicado no passo seguinte, então ninguém
+    perde nem ganha movimento.
+    """
+
+    def __init__(self, near=640, far=1200, mid_every=3, far_every=10):
+        self.near = near
+        self.far = far
+        self.mid_every = mid_every
+        self.far_every = far_every
+
+
+class NumpyEnemyStore:
+    """Estado dos inimigos em arrays contíguos (struct-of-arrays)
+
+    Cada inimigo é só uma "view" com um índice (`slot`) nestes arrays; o
+    movimento, o dano e a remoção dos mortos rodam em lote sobre os arrays.
+    `lag` é o tempo ainda não simulado de quem está num nível de detalhe menor.
+    """
+
+    FIELDS = ("x", "y", "prev_x", "prev_y", "speed", "health", "max_health", "lag")
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.count = 0
+        self.views = []
+        self.ticks = 0
+        self.tier_counts = (0, 0, 0)
+        for field in self.FIELDS:
+            setattr(self, field, np.zeros(capacity, dtype=np.float64))
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self):
+        self.capacity *= 2
+        for field in self.FIELDS:
+            old = getattr(self, field)
+            new = np.zeros(self.capacity, dtype=np.float64)
+            new[:self.count] = old[:self.count]
+            setattr(self, field, new)
+
+    def add(self, view, x, y, speed, health):
+        if self.count == self.capacity:
+            self._grow()
+        slot = self.count
+        self.x[slot] = self.prev_x[slot] = x
+        self.y[slot] = self.prev_y[slot] = y
+        self.speed[slot] = speed
+        self.health[slot] = health
+        self.max_health[slot] = health
+        self.lag[slot] = 0.0
+        self.views.append(view)
+        self.count += 1
+        return slot
+
+    def clear(self):
+        self.count = 0
+        self.views = []
+        self.ticks = 0
+
+    def snapshot(self):
+        """Guarda as posições atuais para a interpolação do desenho"""
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def seek(self, target_x, target_y, dt, flow=None, lod=None):
+        """Move os inimigos em direção ao alvo num único passo vetorizado
+
+        Com um FlowField, quem está dentro do mapa segue o campo em vez de ir
+        em linha reta. Com um SimulationLOD, só quem está na vez do seu nível
+        se move (com todo o tempo acumulado desde o último passo). O alvo
+        pode ser um ponto só ou um por inimigo (ver closest_targets()).
+        """
+        self.ticks += 1
+        n = self.count
+        if n == 0:
+            self.tier_counts = (0, 0, 0)
+            return
+        x = self.x[:n]
+        y = self.y[:n]
+        lag = self.lag[:n]
+        lag += dt
+        dx = target_x - x
+        dy = target_y - y
+        dist = np.hypot(dx, dy)
+
+        if lod is None:
+            slots = np.arange(n)
+            use_flow = np.ones(n, dtype=bool)
+            self.tier_counts = (n, 0, 0)
+        else:
+            near = dist <= lod.near
+            within = dist <= lod.far
+            mid = within & ~near
+            phase = self.ticks + np.arange(n)
+            due = near | (mid & (phase % lod.mid_every == 0)) | (phase % lod.far_every == 0)
+            self.tier_counts = (int(np.count_nonzero(near)), int(np.count_nonzero(mid)),
+                                int(n - np.count_nonzero(within)))
+            slots = np.flatnonzero(due)
+            if len(slots) == 0:
+                return
+            use_flow = within[slots]
+            dx = dx[slots]
+            dy = dy[slots]
+            dist = dist[slots]
+
+        moving = dist > 0
+        step = self.speed[slots] * lag[slots]
+        lag[slots] = 0.0
+        dx = np.divide(dx, dist, out=np.zeros(len(slots)), where=moving)
+        dy = np.divide(dy, dist, out=np.zeros(len(slots)), where=moving)
+        # Em linha reta o passo longo dos níveis baixos não pode passar do alvo
+        # (seguindo o flow field o caminho é mais longo que a reta)
+        move = np.minimum(step, dist)
+        if flow is not None:
+            flow_x, flow_y, valid = flow.directions(x[slots], y[slots])
+            valid &= use_flow
+            dx = np.where(valid, flow_x, dx)
+            dy = np.where(valid, flow_y, dy)
+            move = np.where(valid, step, move)
+        x[slots] += dx * move
+        y[slots] += dy * move
+
+    def closest_targets(self, points):
+        """(xs, ys) do ponto [(x, y)] mais próximo de cada inimigo"""
+        n = self.count
+        px = np.array([point[0] for point in points], dtype=np.float64)
+        py = np.array([point[1] for point in points], dtype=np.float64)
+        dist = (self.x[:n, None] - px) ** 2 + (self.y[:n, None] - py) ** 2
+        best = dist.argmin(axis=1)
+        return px[best], py[best]
+
+    def damage(self, slot, amount):
+        self.health[slot] -= amount
+        return self.health[slot] <= 0
+
+    def damage_many(self, slots, amounts):
+        """Aplica dano em lote; devolve os slots que morreram com este dano"""
+        if not slots:
+            return []
+        slots = np.asarray(slots, dtype=np.intp)
+        before = self.health[slots] > 0
+        np.subtract.at(self.health, slots, np.asarray(amounts, dtype=np.float64))
+        killed = before & (self.health[slots] <= 0)
+        return np.unique(slots[killed]).tolist()
+
+    def compact(self):
+        """Remove os inimigos sem vida e devolve as views removidas"""
+        n = self.count
+        alive = self.health[:n] > 0
+        if alive.all():
+            return []
+        keep = np.flatnonzero(alive)
+        removed = [self.views[i] for i in np.flatnonzero(~alive)]
+        for field in self.FIELDS:
+            array = getattr(self, field)
+            array[:len(keep)] = array[keep]
+        self.views = [self.views[i] for i in keep]
+        for slot, view in enumerate(self.views):
+            view.slot = slot
+        self.count = len(keep)
+        return removed
+
+    def positions(self):
+        n = self.count
+        return self.x[:n].tolist(), self.y[:n].tolist()
+
+    def near(self, cx, cy, radius):
+        """(views, xs, ys) de quem está a até `radius` do ponto"""
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        slots = np.flatnonzero((x - cx) ** 2 + (y - cy) ** 2 <= radius * radius)
+        views = self.views
+        return [views[i] for i in slots.tolist()], x[slots].tolist(), y[slots].tolist()
+
+    def visible(self, view, alpha=1.0):
+        """(view, x, y, fração de vida) dos inimigos dentro de view, já interpolados"""
+        n = self.count
+        left, top, right, bottom = view
+        prev_x = self.prev_x[:n]
+        prev_y = self.prev_y[:n]
+        x = prev_x + (self.x[:n] - prev_x) * alpha
+        y = prev_y + (self.y[:n] - prev_y) * alpha
+        inside = np.flatnonzero((x >= left) & (x <= right) & (y >= top) & (y <= bottom))
+        health = self.health[inside] / self.max_health[inside]
+        views = self.views
+        return [
+            (views[i], xi, yi, hi)
+            for i, xi, yi, hi in zip(inside.tolist(), x[inside].tolist(),
+                                     y[inside].tolist(), health.tolist())
+        ]
+
+
+class ListEnemyStore:
+    """Mesma interface do NumpyEnemyStore usando listas (sem NumPy)"""
+
+    FIELDS = NumpyEnemyStore.FIELDS
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.ticks = 0
+        self.tier_counts = (0, 0, 0)
+        self.clear()
+
+    def __len__(self):
+        return self.count
+
+    def add(self, view, x, y, speed, health):
+        slot = self.count
+        self.x.append(x)
+        self.y.append(y)
+        self.prev_x.append(x)
+        self.prev_y.append(y)
+        self.speed.append(speed)
+        self.health.append(health)
+        self.max_health.append(health)
+        self.lag.append(0.0)
+        self.views.append(view)
+        self.count += 1
+        return slot
+
+    def clear(self):
+        self.count = 0
+        self.views = []
+        self.ticks = 0
+        for field in self.FIELDS:
+            setattr(self, field, [])
+
+    def snapshot(self):
+        self.prev_x = list(self.x)
+        self.prev_y = list(self.y)
+
+    def seek(self, target_x, target_y, dt, flow=None, lod=None):
+        self.ticks += 1
+        x, y, speed, lag = self.x, self.y, self.speed, self.lag
+        if not isinstance(target_x, list):
+            target_x = [target_x] * self.count
+            target_y = [target_y] * self.count
+        tiers = [0, 0, 0]
+        for i in range(self.count):
+            lag[i] += dt
+            dx = target_x[i] - x[i]
+            dy = target_y[i] - y[i]
+            dist = math.hypot(dx, dy)
+            use_flow = True
+            if lod is not None:
+                phase = self.ticks + i
+                if dist <= lod.near:
+                    tiers[0] += 1
+                elif dist <= lod.far:
+                    tiers[1] += 1
+                    if phase % lod.mid_every and phase % lod.far_every:
+                        continue
+                else:
+                    tiers[2] += 1
+                    use_flow = False
+                    if phase % lod.far_every:
+                        continue
+
+            step = speed[i] * lag[i]
+            lag[i] = 0.0
+            direction = flow.direction(x[i], y[i]) if flow is not None and use_flow else None
+            if direction is not None:
+                x[i] += direction[0] * step
+                y[i] += direction[1] * step
+                continue
+            if dist > 0:
+                step = min(step, dist) / dist
+                x[i] += dx * step
+                y[i] += dy * step
+        self.tier_counts = tuple(tiers) if lod is not None else (self.count, 0, 0)
+
+    def closest_targets(self, points):
+        xs, ys = [], []
+        for i in range(self.count):
+            px, py = min(points, key=lambda point: (self.x[i] - point[0]) ** 2 + (self.y[i] - point[1]) ** 2)
+            xs.append(px)
+            ys.append(py)
+        return xs, ys
+
+    def damage(self, slot, amount):
+        self.health[slot] -= amount
+        return self.health[slot] <= 0
+
+    def damage_many(self, slots, amounts):
+        killed = []
+        for slot, amount in zip(slots, amounts):
+            was_alive = self.health[slot] > 0
+            if self.damage(slot, amount) and was_alive:
+                killed.append(slot)
+        return killed
+
+    def compact(self):
+        if all(health > 0 for health in self.health):
+            return []
+        keep = [i for i in range(self.count) if self.health[i] > 0]
+        removed = [self.views[i] for i in range(self.count) if self.health[i] <= 0]
+        for field in self.FIELDS:
+            values = getattr(self, field)
+            setattr(self, field, [values[i] for i in keep])
+        self.views = [self.views[i] for i in keep]
+        for slot, view in enumerate(self.views):
+            view.slot = slot
+        self.count = len(keep)
+        return removed
+
+    def positions(self):
+        return list(self.x), list(self.y)
+
+    def near(self, cx, cy, radius):
+        found = [
+            i for i in range(self.count)
+            if (self.x[i] - cx) ** 2 + (self.y[i] - cy) ** 2 <= radius * radius
+        ]
+        return ([self.views[i] for i in found], [self.x[i] for i in found],
+                [self.y[i] for i in found])
+
+    def visible(self, view, alpha=1.0):
+        left, top, right, bottom = view
+        found = []
+        for i in range(self.count):
+            x = self.prev_x[i] + (self.x[i] - self.prev_x[i]) * alpha
+            y = self.prev_y[i] + (self.y[i] - self.prev_y[i]) * alpha
+            if left <= x <= right and top <= y <= bottom:
+                found.append((self.views[i], x, y, self.health[i] / self.max_health[i]))
+        return found
+
+
+def create_enemy_store(use_numpy=True, capacity=64):
+    if use_numpy and np is not None:
+        return NumpyEnemyStore(capacity)
+    if use_numpy:
+        print("AVISO: numpy não encontrado - usando listas para os inimigos")
+    return ListEnemyStore(capacity)
@@ -0,0 +1,161 @@
+import math
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Vizinhança de 8 células: (dx, dy)
+NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+def walkable_cells(walk_grid, cell_size, min_walkable=0.5):
+    """Reduz o mapa a células de `cell_size`: (colunas, linhas, bytes 0/1)"""
+    cols = walk_grid.get_width() // cell_size
+    rows = walk_grid.get_height() // cell_size
+    if np is not None:
+        pixels = walk_grid.as_array()[:rows * cell_size, :cols * cell_size]
+        ratio = pixels.reshape(rows, cell_size, cols, cell_size).mean(axis=(1, 3))
+        return cols, rows, bytearray((ratio >= min_walkable).astype(np.uint8).ravel().tobytes())
+
+    # Sem NumPy: usa o pixel central de cada célula
+    cells = bytearray(cols * rows)
+    for row in range(rows):
+        for col in range(cols):
+            if walk_grid.is_walkable(col * cell_size + cell_size // 2, row * cell_size + cell_size // 2):
+                cells[row * cols + col] = 1
+    return cols, rows, cells
+
+
+class FlowField:
+    """Campo de direções até o jogador sobre uma versão reduzida do mapa
+
+    Uma única busca em largura a partir da célula do jogador serve para todos
+    os inimigos; cada um só consulta a direção da própria célula em O(1). A
+    busca só é refeita quando o jogador troca de célula. Com vários alvos
+    (co-op) a busca parte de todos ao mesmo tempo e cada célula aponta para
+    o alvo mais próximo pelo caminho.
+    """
+
+    def __init__(self, walk_grid, cell_size=24, min_walkable=0.5):
+        self._setup(cell_size, *walkable_cells(walk_grid, cell_size, min_walkable))
+
+    @classmethod
+    def from_cells(cls, cols, rows, cells, cell_size):
+        """Campo sobre células já reduzidas (1 = dá para andar), sem o mapa inteiro"""
+        field = cls.__new__(cls)
+        field._setup(cell_size, cols, rows, bytearray(cells))
+        return field
+
+    def _setup(self, cell_size, cols, rows, walkable):
+        self.cell_size = cell_size
+        self.cols = cols
+        self.rows = rows
+        self.walkable = walkable
+        self.target_cell = None
+        self.target_cells = ()
+        self.distance = []
+        self.dir_x = []
+        self.dir_y = []
+        self.rebuilds = 0
+
+    def cell_of(self, x, y):
+        col = int(x // self.cell_size)
+        row = int(y // self.cell_size)
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return col, row
+        return None
+
+    def update(self, target_x, target_y):
+        """Refaz o campo se o alvo mudou de célula; devolve True se refez"""
+        cell = self.cell_of(target_x, target_y)
+        if cell is None or (cell,) == self.target_cells:
+            return False
+        self.target_cell = cell
+        self.target_cells = (cell,)
+        self._rebuild(self.target_cells)
+        return True
+
+    def update_many(self, targets):
+        """update() para vários alvos [(x, y)]; devolve True se refez"""
+        cells = []
+        for x, y in targets:
+            cell = self.cell_of(x, y)
+            if cell is not None and cell not in cells:
+                cells.append(cell)
+        cells = tuple(sorted(cells))
+        if not cells or cells == self.target_cells:
+            return False
+        self.target_cell = cells[0]
+        self.target_cells = cells
+        self._rebuild(cells)
+        return True
+
+    def _rebuild(self, targets):
+        cols, rows, walkable = self.cols, self.rows, self.walkable
+        total = cols * rows
+        distance = [-1] * total
+        dir_x = [0.0] * total
+        dir_y = [0.0] * total
+
+        for col, row in targets:
+            distance[row * cols + col] = 0
+        queue = deque(targets)
+        diagonal = 1 / math.sqrt(2)
+        while queue:
+            col, row = queue.popleft()
+            index = row * cols + col
+            for dx, dy in NEIGHBOURS:
+                ncol, nrow = col + dx, row + dy
+                if not (0 <= ncol < cols and 0 <= nrow < rows):
+                    continue
+                nindex = nrow * cols + ncol
+                if distance[nindex] != -1 or not walkable[nindex]:
+                    continue
+                # Não corta quina de parede na diagonal
+                if dx and dy and not (walkable[row * cols + ncol] and walkable[nrow * cols + col]):
+                    continue
+                distance[nindex] = distance[index] + 1
+                scale = diagonal if dx and dy else 1.0
+                dir_x[nindex] = -dx * scale
+                dir_y[nindex] = -dy * scale
+                queue.append((ncol, nrow))
+
+        self.distance = distance
+        if np is not None:
+            self.distance = np.array(distance, dtype=np.int32)
+            dir_x = np.array(dir_x)
+            dir_y = np.array(dir_y)
+        self.dir_x = dir_x
+        self.dir_y = dir_y
+        self.rebuilds += 1
+
+    def direction(self, x, y):
+        """Direção unitária a seguir a partir de (x, y), ou None para ir reto"""
+        cell = self.cell_of(x, y)
+        if cell is None or self.target_cell is None:
+            return None
+        index = cell[1] * self.cols + cell[0]
+        if self.distance[index] <= 0:
+            return None
+        return float(self.dir_x[index]), float(self.dir_y[index])
+
+    def directions(self, xs, ys):
+        """Versão vetorizada de direction(): devolve (dx, dy, valid) como arrays"""
+        n = len(xs)
+        valid = np.zeros(n, dtype=bool)
+        dx = np.zeros(n)
+        dy = np.zeros(n)
+        if self.target_cell is None or n == 0:
+            return dx, dy, valid
+
+        cols = np.floor_divide(xs, self.cell_size).astype(np.intp)
+        rows = np.floor_divide(ys, self.cell_size).astype(np.intp)
+        inside = (cols >= 0) & (cols < self.cols) & (rows >= 0) & (rows < self.rows)
+        index = np.where(inside, rows * self.cols + cols, 0)
+        valid = inside & (self.distance[index] > 0)
+        dx = np.where(valid, self.dir_x[index], 0.0)
+        dy = np.where(valid, self.dir_y[index], 0.0)
+        return dx, dy, valid
@@ -0,0 +1,231 @@
+"""Modo headless: roda o Game sem janela nem som, o mais rápido possível
+
+    python headless.py --runs 10 --waves 30 --seed 1
+
+Usa os drivers "dummy" do SDL, então funciona em máquinas de CI sem display.
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from types import ModuleType
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+GAME_FILE = os.path.join(GAME_DIR, "main.py")
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+_game_module = None
+
+
+def load_game_module():
+    """Carrega main.py do mesmo jeito que o pgzrun, mas sem entrar no loop"""
+    global _game_module
+    if _game_module is not None:
+        return _game_module
+
+    os.chdir(GAME_DIR)
+    # Com _pgzrun ligado, "import pgzrun" e pgzrun.go() viram no-op
+    sys._pgzrun = True
+    from pgzero.runner import prepare_mod
+
+    with open(GAME_FILE) as f:
+        code = compile(f.read(), GAME_FILE, "exec", dont_inherit=True)
+    mod = ModuleType("main")
+    mod.__file__ = GAME_FILE
+    sys.modules["main"] = mod
+    prepare_mod(mod)
+    exec(code, mod.__dict__)
+
+    _game_module = mod
+    return mod
+
+
+def attach_screen(mod, surface):
+    """Dá ao módulo um `screen` que desenha numa superfície qualquer"""
+    import pgzero.screen
+    mod.screen = pgzero.screen.Screen(surface)
+    return mod.screen
+
+
+def nearest_enemy(game):
+    px, py = game.player.pos
+    best = None
+    best_dist = math.inf
+    for enemy in game.enemies:
+        dist = (enemy.x - px) ** 2 + (enemy.y - py) ** 2
+        if dist < best_dist:
+            best, best_dist = enemy, dist
+    return best, math.sqrt(best_dist)
+
+
+class ScriptedInput:
+    """Repete uma lista de quadros de entrada, um por tick
+
+    Cada quadro é (move_x, move_y, mouse_x, mouse_y, click, teclas).
+    """
+
+    def __init__(self, frames, loop=False):
+        self.frames = list(frames)
+        self.loop = loop
+        self.tick = 0
+        self.current = (0, 0, 0, 0, False, ())
+
+    def advance(self):
+        if self.tick < len(self.frames):
+            self.current = self.frames[self.tick]
+        elif self.loop and self.frames:
+            self.current = self.frames[self.tick % len(self.frames)]
+        else:
+            self.current = (0, 0, 0, 0, False, ())
+        self.tick += 1
+
+    def movement(self):
+        return self.current[0], self.current[1]
+
+    def mouse_pos(self):
+        return self.current[2], self.current[3]
+
+    def mouse_pressed(self):
+        return self.current[4]
+
+    def pressed(self, key):
+        return key in self.current[5]
+
+
+class BotInput:
+    """Bot simples: mira no inimigo mais próximo, atira sem parar e foge dele"""
+
+    def __init__(self, game, seed=None, kite_distance=200, upgrade_policy="random"):
+        self.game = game
+        self.rng = random.Random(seed)
+        self.kite_distance = kite_distance
+        self.upgrade_policy = upgrade_policy
+        self.wander = (0, 0)
+        self.target = None
+        self.target_dist = math.inf
+        self.upgrade_key = "1"
+
+    def advance(self):
+        self.target, self.target_dist = nearest_enemy(self.game)
+        if self.rng.random() < 0.02:
+            self.wander = (self.rng.choice((-1, 0, 1)), self.rng.choice((-1, 0, 1)))
+        if self.upgrade_policy == "random":
+            self.upgrade_key = self.rng.choice(("1", "2", "3"))
+        elif str(self.upgrade_policy) in ("1", "2", "3"):
+            self.upgrade_key = str(self.upgrade_policy)
+        else:
+            # Nome de um UpgradeType: pega ele quando aparecer, senão sorteia
+            offered = [upgrade.name for upgrade in self.game.available_upgrades]
+            if self.upgrade_policy in offered:
+                self.upgrade_key = str(offered.index(self.upgrade_policy) + 1)
+            else:
+                self.upgrade_key = self.rng.choice(("1", "2", "3"))
+
+    def movement(self):
+        if self.target is None or self.target_dist > self.kite_distance:
+            return self.wander
+        px, py = self.game.player.pos
+        away_x = px - self.target.x
+        away_y = py - self.target.y
+        return (int(away_x > 0) - int(away_x < 0), int(away_y > 0) - int(away_y < 0))
+
+    def mouse_pos(self):
+        camera = self.game.camera
+        if self.target is None:
+            return (self.game.player.pos[0] - camera.offset_x + 1,
+                    self.game.player.pos[1] - camera.offset_y)
+        return (self.target.x - camera.offset_x, self.target.y - camera.offset_y)
+
+    def mouse_pressed(self):
+        return self.target is not None
+
+    def pressed(self, key):
+        return key == self.upgrade_key
+
+
+def new_game(seed=None, controls=None):
+    """Cria um Game novo já em PLAYING, mudo e com a entrada trocada"""
+    mod = load_game_module()
+    if seed is not None:
+        random.seed(seed)
+    game = mod.Game(async_loading=False)
+    game.music_enabled = False
+    game.sound_enabled = False
+    import pygame
+    if pygame.mixer.get_init():
+        pygame.mixer.stop()
+        game.stop_music()
+    game.reset()
+    game.input = controls if controls is not None else BotInput(game, seed)
+    return game
+
+
+def run_game(game, max_ticks=100000, max_waves=None, dt=1 / 60, on_tick=None):
+    """Roda até o game over, até `max_waves` ou até `max_ticks`"""
+    mod = load_game_module()
+    ticks = 0
+    start = time.perf_counter()
+    while ticks < max_ticks:
+        if max_waves is not None and game.wave > max_waves:
+            break
+        if game.state == mod.GameState.GAME_OVER:
+            break
+        game.input.advance()
+        game.tick(dt)
+        ticks += 1
+        if on_tick is not None:
+            on_tick(game, ticks)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "ticks": ticks,
+        "simulated_time": ticks * dt,
+        "wall_time": elapsed,
+        "ticks_per_second": ticks / elapsed if elapsed > 0 else 0.0,
+        "wave": game.wave,
+        "kills": game.total_kills,
+        "health": game.player.health,
+        "game_over": game.state == mod.GameState.GAME_OVER,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Roda partidas sem janela com um bot")
+    parser.add_argument("--runs", type=int, default=1, help="quantas partidas")
+    parser.add_argument("--seed", type=int, default=0, help="semente da primeira partida")
+    parser.add_argument("--waves", type=int, default=None, help="para ao passar desta wave")
+    parser.add_argument("--ticks", type=int, default=100000, help="limite de ticks por partida")
+    parser.add_argument("--dt", type=float, default=1 / 60, help="passo de simulação em segundos")
+    parser.add_argument("--record", metavar="ARQUIVO", help="grava a primeira partida como replay (.ksr)")
+    parser.add_argument("--warmup", type=int, default=0, metavar="TICKS",
+                        help="joga estes ticks e reinicia antes de valer, como um F5 no meio da sessão")
+    args = parser.parse_args(argv)
+
+    for run in range(args.runs):
+        seed = args.seed + run
+        game = new_game(seed)
+        if args.warmup:
+            run_game(game, args.warmup, dt=args.dt)
+            game.reset()
+        recorder = None
+        if args.record and run == 0:
+            from replay import ReplayRecorder
+            recorder = ReplayRecorder(game)
+        stats = run_game(game, args.ticks, args.waves, args.dt,
+                         on_tick=recorder and (lambda game, tick: recorder.record_tick(game)))
+        game.shutdown()
+        if recorder is not None:
+            recorder.stop(args.record)
+            print(f"Replay salvo em {args.record}")
+        print(f"seed={seed} wave={stats['wave']} kills={stats['kills']} "
+              f"vida={stats['health']:.0f} ticks={stats['ticks']} "
+              f"game_over={stats['game_over']} "
+              f"{stats['ticks_per_second']:.0f} ticks/s")
+
+
+if __name__ == "__main__":
+    main()
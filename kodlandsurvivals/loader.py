@@ -0,0 +1,66 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class AssetLoader:
+    """Lê e decodifica arquivos num pool de threads sem travar o jogo
+
+    `submit(nome, load, ..., finish=f)` roda `load` numa thread; `finish`
+    roda depois na thread principal, dentro de poll(), para o que só pode
+    ser feito lá (convert/convert_alpha precisam da janela).
+    """
+
+    def __init__(self, max_workers=4):
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="assets")
+        self._pending = {}
+        self.results = {}
+        self.errors = {}
+        self.started = time.perf_counter()
+        self.elapsed = None
+
+    def submit(self, name, load, *args, finish=None):
+        future = self._executor.submit(load, *args)
+        self._pending[name] = (future, finish)
+        return future
+
+    @property
+    def total(self):
+        return len(self._pending) + len(self.results)
+
+    @property
+    def done(self):
+        return len(self.results)
+
+    def progress(self):
+        return self.done / self.total if self.total else 1.0
+
+    def poll(self):
+        """Recolhe o que já terminou; devolve True quando não falta nada"""
+        for name, (future, finish) in list(self._pending.items()):
+            if not future.done():
+                continue
+            del self._pending[name]
+            try:
+                result = future.result()
+                if finish is not None and result is not None:
+                    result = finish(result)
+            except Exception as e:
+                print(f"Erro ao carregar {name}: {e}")
+                self.errors[name] = e
+                result = None
+            self.results[name] = result
+
+        if self._pending or self.elapsed is not None:
+            return not self._pending
+        self.elapsed = time.perf_counter() - self.started
+        self._executor.shutdown(wait=False)
+        return True
+
+    def wait(self):
+        """Bloqueia até tudo terminar (modo headless / sem tela de loading)"""
+        wait([future for future, _ in self._pending.values()])
+        return self.poll()
+
+    def get(self, name, default=None):
+        result = self.results.get(name)
+        return default if result is None else result
@@ -1,11 +1,36 @@
 # type: ignore
 import pgzrun
 import pygame
+import atexit
 import os
+import sys
 import random
 import math
+import time
 from enum import Enum
 
+# "pgzrun main.py" não coloca a pasta do jogo no sys.path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from assets import AssetCache
+from assetpack import AssetPack
+from spatial import SpatialHash, bounding_radius, circles_overlap
+from enemystore import SimulationLOD, create_enemy_store
+from pools import Pool
+from walkability import WalkabilityGrid
+from flowfield import FlowField
+from profiler import FrameProfiler
+from textcache import TextCache, HudField, line_height
+from background import ChunkedBackground, DirtyRects
+from render import HealthBars, SpriteBatch
+from loader import AssetLoader
+from audio import VoiceManager
+from spawner import SpawnScheduler
+from replay import ReplayRecorder
+from particles import ParticleSystem
+from world import ChunkStreamer
+from netplay import CoopClient
+
 
 WIDTH = 800
 HEIGHT = 600
@@ -13,15 +38,88 @@ TITLE = "Kodland Survival"
 
 
 SPAWN_DISTANCE = 800
+SPAWNS_PER_FRAME = 3
+SPAWN_TIME_BUDGET = None  # segundos por frame; None = só o limite de quantidade
+WAVE_PATTERNS = ("scatter", "ring", "burst", "trickle")
 ENEMY_SPAWN_RATE = 0.5
 MAX_ENEMIES = 20
 SCALE_FACTOR = 0.3
 PROJECTILE_SCALE = 0.15
 PLAYER_HEALTH = 100
 ENEMY_HEALTH = 30
+WAVE_HEALTH_SCALING = 0.1
+WAVE_SPEED_SCALING = 0.05
 PROJECTILE_SPEED = 500
 PROJECTILE_DAMAGE = 10
+PROJECTILE_LIFETIME = 2.0
+PROJECTILE_RANGE = 900
+PROJECTILE_CULL_MARGIN = 50
+PROJECTILE_DRAW_SCALE = 1.0
+PROJECTILE_ROTATION_STEPS = 360
+PROJECTILE_ROTATION_CACHE = 256
+CURSOR_SCALE = 0.07
 PLAYER_INVULNERABILITY_TIME = 0.3 
+SIMULATION_HZ = 60
+MAX_CATCH_UP_STEPS = 5
+PROFILER_ENABLED = True
+BACKGROUND_CHUNK_CACHE = 9
+DIRTY_RECTS = False
+RENDER_CULL_MARGIN = 64
+COLLISION_CELL_SIZE = 64
+COLLISION_MAP_FILE = "images/colisaobackground.png"
+FLOW_FIELD_CELL_SIZE = 24
+WORLD_DIR = "world"  # gerado por "python world.py"; sem ele o mapa vem dos PNGs inteiros
+WORLD_CHUNK_SIZE = 360  # múltiplo de FLOW_FIELD_CELL_SIZE
+WORLD_CACHE_BYTES = 16 * 1024 * 1024
+WORLD_PREFETCH_MARGIN = 360  # pixels além da tela pedidos antes de aparecerem
+WORLD_WRAP = True  # o fundo se repete fora do mapa, como o background.png
+WORLD_PLACEHOLDER_COLOR = (40, 40, 40)
+USE_NUMPY_ENEMIES = True
+ENEMY_LOD = True
+LOD_NEAR_RADIUS = 640  # cobre a tela + PROJECTILE_CULL_MARGIN: só aqui há colisões
+LOD_FAR_RADIUS = 1200
+LOD_MID_INTERVAL = 3
+LOD_FAR_INTERVAL = 10
+ASYNC_LOADING = True
+LOADER_THREADS = 4
+MUSIC_FILE = "music/background.mp3"
+MUSIC_VOLUME = 0.5
+ASSET_PACK = "images/sprites.pack"
+# (imagem, escala, recorte, passos de rotação) que o "python assetpack.py" deixa prontos
+PACKED_SPRITES = [
+    ("player1sprite.png", SCALE_FACTOR, False, 0),
+    ("player2sprite.png", SCALE_FACTOR, False, 0),
+    ("player3sprite.png", SCALE_FACTOR, False, 0),
+    ("enemy.png", SCALE_FACTOR, False, 0),
+    ("projetil.png", PROJECTILE_SCALE, False, 0),
+    ("projetil.png", PROJECTILE_DRAW_SCALE, True, PROJECTILE_ROTATION_STEPS),
+    ("cursor.png", CURSOR_SCALE, False, 0),
+    ("background.png", 1.0, False, 0),
+]
+PRELOAD_IMAGES = ("player1sprite.png", "player2sprite.png", "player3sprite.png",
+                  "enemy.png", "projetil.png", "cursor.png")
+# atributo do Game -> (arquivo, volume, categoria)
+SOUND_FILES = {
+    "menu_click_sound": ("sounds/botaomenu.mp3", 0.3, "interface"),
+    "shoot_sound": ("sounds/tiro.mp3", 0.2, "tiros"),  # Volume mais baixo
+    "enemy_spawn_sound": ("sounds/inimigo.mp3", 0.3, "inimigos"),
+    "death_sound": ("sounds/morte.mp3", 0.4, "mortes"),
+}
+# categoria -> canais reservados no mixer
+AUDIO_CHANNELS = {"interface": 1, "tiros": 3, "inimigos": 2, "mortes": 2}
+SOUND_COALESCE_WINDOW = 0.05
+PROJECTILE_POOL_SIZE = 256
+ENEMY_POOL_SIZE = 512
+NET_SERVER = os.environ.get("KODLAND_SERVER")  # "host:porta" para entrar num co-op
+PARTICLE_CAPACITY = 2048
+PARTICLE_EMIT_PER_TICK = 256
+PARTICLE_DRAW_LIMIT = 1500
+PARTICLE_TIME_BUDGET = 0.002  # segundos por frame para atualizar + desenhar
+PARTICLE_COLORS = {
+    "faisca": (255, 220, 90),
+    "sangue": (190, 30, 30),
+    "poeira": (120, 100, 80),
+}
 
 
 class GameState(Enum):
@@ -29,6 +127,7 @@ class GameState(Enum):
     PLAYING = 1
     GAME_OVER = 2
     UPGRADE_SELECTION = 3
+    LOADING = 4
 
 
 class UpgradeType(Enum):
@@ -46,40 +145,59 @@ class Camera:
     
     def follow(self, target):
         self.target = target
-        self.offset_x = target.pos[0] - WIDTH // 2
-        self.offset_y = target.pos[1] - HEIGHT // 2
+        self.center_on(target.pos)
+    
+    def center_on(self, pos):
+        self.offset_x = pos[0] - WIDTH // 2
+        self.offset_y = pos[1] - HEIGHT // 2
     
     def apply(self, pos):
         return (pos[0] - self.offset_x, pos[1] - self.offset_y)
+    
+    def view_rect(self, margin=0):
+        """Área visível em coordenadas do mundo: (esquerda, topo, direita, base)"""
+        return (self.offset_x - margin, self.offset_y - margin,
+                self.offset_x + WIDTH + margin, self.offset_y + HEIGHT + margin)
+
+
+ASSETS = AssetCache("images", AssetPack.open(ASSET_PACK, "images"))
+TEXT = TextCache()
+PLAYER_HEALTH_BARS = HealthBars(50, 5)
+ENEMY_HEALTH_BARS = HealthBars(30, 3)
+
+
+def lerp(a, b, alpha):
+    return a + (b - a) * alpha
+
 
 class Projectile:
-    def __init__(self, x, y, target_x, target_y):
-        if os.path.exists("images/projetil.png"):
-            self.sprite = Actor("projetil.png")
-            
-            orig_width = self.sprite._orig_surf.get_width()
-            orig_height = self.sprite._orig_surf.get_height()
-            self.sprite._surf = pygame.transform.scale(
-                self.sprite._orig_surf,
-                (int(orig_width * PROJECTILE_SCALE),
-                int(orig_height * PROJECTILE_SCALE)))
-            self.sprite.width = int(orig_width * PROJECTILE_SCALE)
-            self.sprite.height = int(orig_height * PROJECTILE_SCALE)
-            
-            
-            self.mask = pygame.mask.from_surface(self.sprite._surf)
-        else:
-            print("AVISO: projetil.png não encontrado - usando fallback")
-            self.sprite = Actor('rect')
-            self.sprite.width = 10
-            self.sprite.height = 5
-            self.sprite.color = (255, 255, 0)  
-            self.mask = None
-        
-        self.sprite.x = x
-        self.sprite.y = y
-        self.width = self.sprite.width
-        self.height = self.sprite.height
+    __slots__ = ("surf", "mask", "width", "height", "radius", "rotations",
+                 "x", "y", "prev_x", "prev_y", "vx", "vy", "angle", "origin", "age",
+                 "uid", "pool_index")
+    
+    def __init__(self, *args):
+        self.pool_index = -1
+        if args:
+            self.reset(*args)
+    
+    def reset(self, x, y, target_x, target_y):
+        asset = ASSETS.sprite("projetil.png", PROJECTILE_SCALE,
+                              fallback_size=(10, 5), fallback_color=(255, 255, 0))
+        self.surf = asset.surf
+        self.mask = asset.mask
+        self.width = asset.width
+        self.height = asset.height
+        self.radius = bounding_radius(self.width, self.height)
+        # O desenho usa a arte no tamanho original (sem a borda transparente);
+        # PROJECTILE_SCALE vale só para a máscara de colisão
+        self.rotations = ASSETS.rotations("projetil.png", PROJECTILE_DRAW_SCALE,
+                                          PROJECTILE_ROTATION_STEPS, PROJECTILE_ROTATION_CACHE,
+                                          crop=True)
+        
+        self.x = self.prev_x = x
+        self.y = self.prev_y = y
+        self.origin = (x, y)
+        self.age = 0.0
         
         
         dx = target_x - x
@@ -90,73 +208,69 @@ class Projectile:
         
         
         self.angle = math.degrees(math.atan2(-dy, dx))
-        self.sprite.angle = self.angle
     
-    def update(self, dt):
-        self.sprite.x += self.vx * dt
-        self.sprite.y += self.vy * dt
+    def update(self, dt, views=()):
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        self.age += dt
+        
+        if self.age >= PROJECTILE_LIFETIME:
+            return True
         
+        dx = self.x - self.origin[0]
+        dy = self.y - self.origin[1]
+        if dx * dx + dy * dy > PROJECTILE_RANGE * PROJECTILE_RANGE:
+            return True
         
-        if (self.sprite.x < -50 or self.sprite.x > WIDTH + 50 or
-            self.sprite.y < -50 or self.sprite.y > HEIGHT + 50):
-            return True  
-        return False
+        # views = Camera.view_rect() de cada jogador: some quando sai de todas
+        for view in views:
+            if view[0] <= self.x <= view[2] and view[1] <= self.y <= view[3]:
+                return False
+        return bool(views)
     
     def collides_with(self, enemy):
-        if not self.mask:
+        if not self.mask or not enemy.mask:
             
-            return (abs(self.sprite.x - enemy.sprite.x) < (enemy.width/2 + self.width/2) and
-                    abs(self.sprite.y - enemy.sprite.y) < (enemy.height/2 + self.height/2))
+            return (abs(self.x - enemy.x) < (enemy.width/2 + self.width/2) and
+                    abs(self.y - enemy.y) < (enemy.height/2 + self.height/2))
         
         
-        offset_x = enemy.sprite.x - self.sprite.x
-        offset_y = enemy.sprite.y - self.sprite.y
+        offset_x = (enemy.x - enemy.width/2) - (self.x - self.width/2)
+        offset_y = (enemy.y - enemy.height/2) - (self.y - self.height/2)
         return self.mask.overlap(enemy.mask, (int(offset_x), int(offset_y))) is not None
     
-    def draw(self, camera=None):
+    def render(self, batch, camera, alpha=1.0):
         
-        rotated_surf = pygame.transform.rotate(self.sprite._orig_surf, self.angle)
-        
-        if camera:
-            
-            pos = camera.apply((self.sprite.x - rotated_surf.get_width()/2, 
-                             self.sprite.y - rotated_surf.get_height()/2))
-            screen.blit(rotated_surf, pos)
-        else:
-            
-            screen.blit(rotated_surf, (self.sprite.x - rotated_surf.get_width()/2,
-                                     self.sprite.y - rotated_surf.get_height()/2))
+        rotated_surf = self.rotations.get(self.angle)
+        x = lerp(self.prev_x, self.x, alpha)
+        y = lerp(self.prev_y, self.y, alpha)
+        batch.add("projeteis", rotated_surf,
+                  camera.apply((x - rotated_surf.get_width()/2, y - rotated_surf.get_height()/2)))
 
 class Player:
     def __init__(self):
         self.sprites = []
         for i in range(1, 4):
             sprite_name = f"player{i}sprite.png"
-            if os.path.exists(f"images/{sprite_name}"):
-                actor = Actor(sprite_name)
-                actor._surf = pygame.transform.scale(actor._orig_surf, 
-                    (int(actor._orig_surf.get_width() * SCALE_FACTOR), 
-                    int(actor._orig_surf.get_height() * SCALE_FACTOR)))
-                actor.width = actor._surf.get_width()
-                actor.height = actor._surf.get_height()
-                self.sprites.append(actor)
-            else:
-                print(f"AVISO: Arquivo {sprite_name} não encontrado na pasta images/")
+            if ASSETS.has(sprite_name):
+                self.sprites.append(ASSETS.sprite(sprite_name, SCALE_FACTOR).surf)
         
         if not self.sprites:
             print("Usando fallback - retângulo vermelho")
-            self.sprites = [Actor('rect')]
-            self.sprites[0].width = 30 * SCALE_FACTOR
-            self.sprites[0].height = 30 * SCALE_FACTOR
-            self.sprites[0].color = (255, 0, 0)
+            self.sprites = [ASSETS.sprite("player1sprite.png", SCALE_FACTOR,
+                                          fallback_size=(30 * SCALE_FACTOR, 30 * SCALE_FACTOR),
+                                          fallback_color=(255, 0, 0)).surf]
         
         self.current_sprite = 0
         self.animation_speed = 0.2
         self.animation_time = 0
         self.speed = 300
         self.pos = [WIDTH//2, HEIGHT//2]
-        self.width = self.sprites[0].width
-        self.height = self.sprites[0].height
+        self.prev_pos = tuple(self.pos)
+        self.width = self.sprites[0].get_width()
+        self.height = self.sprites[0].get_height()
         self.health = PLAYER_HEALTH
         self.max_health = PLAYER_HEALTH
         self.invulnerable = False
@@ -164,9 +278,7 @@ class Player:
         self.damage_multiplier = 1.0
         self.vampirism = 0.0  
         self.fire_rate_multiplier = 1.0
-        
-        for sprite in self.sprites:
-            sprite.pos = self.pos
+        self.shoot_cooldown = 0
     
     def take_damage(self, amount):
         if not self.invulnerable:
@@ -179,14 +291,16 @@ class Player:
     def heal(self, amount):
         self.health = min(self.health + amount, self.max_health)
     
-    def update(self, dt, collision_map=None):
+    def update(self, dt, collision_map=None, movement=None):
+        self.prev_pos = tuple(self.pos)
         if self.invulnerable:
             self.invulnerability_timer -= dt
             if self.invulnerability_timer <= 0:
                 self.invulnerable = False
         
-        move_x = keyboard.d - keyboard.a
-        move_y = keyboard.s - keyboard.w
+        if movement is None:
+            movement = (keyboard.d - keyboard.a, keyboard.s - keyboard.w)
+        move_x, move_y = movement
         
         new_pos = [
             self.pos[0] + move_x * self.speed * dt,
@@ -196,19 +310,13 @@ class Player:
         if collision_map is None or self.check_collision(new_pos, collision_map):
             self.pos = new_pos
         
-        for sprite in self.sprites:
-            sprite.pos = self.pos
-        
         if move_x != 0 or move_y != 0:
             self.animate(dt)
         else:
             self.current_sprite = 0
     
     def check_collision(self, new_pos, collision_map):
-        x, y = int(new_pos[0]), int(new_pos[1])
-        if 0 <= x < collision_map.get_width() and 0 <= y < collision_map.get_height():
-            return collision_map.get_at((x, y)) == (0, 0, 0, 255)
-        return False
+        return collision_map.is_walkable(new_pos[0], new_pos[1])
     
     def animate(self, dt):
         self.animation_time += dt
@@ -216,133 +324,124 @@ class Player:
             self.animation_time = 0
             self.current_sprite = (self.current_sprite + 1) % len(self.sprites)
     
-    def draw(self, camera=None):
+    def render_pos(self, alpha=1.0):
+        return (lerp(self.prev_pos[0], self.pos[0], alpha),
+                lerp(self.prev_pos[1], self.pos[1], alpha))
+    
+    def render(self, batch, camera, alpha=1.0):
+        x, y = self.render_pos(alpha)
         if len(self.sprites) > 0:
             
             if not self.invulnerable or (self.invulnerability_timer * 10) % 2 < 1:
-                if camera:
-                    screen.blit(self.sprites[self.current_sprite]._surf, 
-                              camera.apply((self.pos[0] - self.width/2, 
-                                          self.pos[1] - self.height/2)))
-                else:
-                    self.sprites[self.current_sprite].draw()
-        
-        
-        health_width = 50
-        health_height = 5
-        health_x = self.pos[0] - health_width/2
-        health_y = self.pos[1] - self.height/2 - 10
-        
-        if camera:
-            screen.draw.filled_rect(
-                Rect(camera.apply((health_x, health_y)), (health_width, health_height)),
-                (255, 0, 0)
-            )
-            screen.draw.filled_rect(
-                Rect(camera.apply((health_x, health_y)), (health_width * (self.health/self.max_health), health_height)),
-                (0, 255, 0)
-            )
+                batch.add("jogador", self.sprites[self.current_sprite],
+                          camera.apply((x - self.width/2, y - self.height/2)))
+        
+        
+        health_bar = PLAYER_HEALTH_BARS.get(self.health/self.max_health)
+        batch.add("barras", health_bar,
+                  camera.apply((x - health_bar.get_width()/2, y - self.height/2 - 10)))
+
+def _store_field(name):
+    def get(self):
+        return getattr(self.store, name)[self.slot]
+
+    def set(self, value):
+        getattr(self.store, name)[self.slot] = value
+
+    return property(get, set)
+
 
 class Enemy:
-    def __init__(self, player_pos, health_multiplier=1.0, speed_multiplier=1.0):
-        if os.path.exists("images/enemy.png"):
-            self.sprite = Actor("enemy.png")
-            self.sprite._surf = pygame.transform.scale(self.sprite._orig_surf, 
-                (int(self.sprite._orig_surf.get_width() * SCALE_FACTOR), 
-                 int(self.sprite._orig_surf.get_height() * SCALE_FACTOR)))
-            self.width = self.sprite._surf.get_width()
-            self.height = self.sprite._surf.get_height()
-            self.mask = pygame.mask.from_surface(self.sprite._surf)
-        else:
-            print("AVISO: enemy.png não encontrado - usando fallback")
-            self.sprite = Actor('rect')
-            self.width = 25 * SCALE_FACTOR
-            self.height = 25 * SCALE_FACTOR
-            self.sprite.width = self.width
-            self.sprite.height = self.height
-            self.sprite.color = (255, 165, 0)
-            self.mask = None
-        
-        self.spawn_away_from_player(player_pos)
+    """View de um inimigo: posição, velocidade e vida moram no EnemyStore"""
+
+    __slots__ = ("surf", "mask", "width", "height", "radius",
+                 "base_speed", "base_health", "store", "slot", "uid", "pool_index")
+
+    x = _store_field("x")
+    y = _store_field("y")
+    prev_x = _store_field("prev_x")
+    prev_y = _store_field("prev_y")
+    speed = _store_field("speed")
+    health = _store_field("health")
+    max_health = _store_field("max_health")
+
+    def __init__(self, *args):
+        self.pool_index = -1
+        if args:
+            self.reset(*args)
+
+    def reset(self, store, x, y, health_multiplier=1.0, speed_multiplier=1.0):
+        asset = ASSETS.sprite("enemy.png", SCALE_FACTOR,
+                              fallback_size=(25 * SCALE_FACTOR, 25 * SCALE_FACTOR),
+                              fallback_color=(255, 165, 0))
+        self.surf = asset.surf
+        self.mask = asset.mask
+        self.width = asset.width
+        self.height = asset.height
+        self.radius = bounding_radius(self.width, self.height)
+        
         self.base_speed = random.uniform(50, 100)
-        self.speed = self.base_speed * speed_multiplier
         self.base_health = ENEMY_HEALTH
-        self.health = int(self.base_health * health_multiplier)
-        self.max_health = self.health
-    
-    def spawn_away_from_player(self, player_pos):
-        angle = random.uniform(0, 2 * math.pi)
-        distance = random.uniform(SPAWN_DISTANCE, SPAWN_DISTANCE + 100)
-        x = player_pos[0] + math.cos(angle) * distance
-        y = player_pos[1] + math.sin(angle) * distance
-        self.sprite.pos = (x, y)
+        self.store = store
+        self.slot = store.add(self, x, y,
+                              self.base_speed * speed_multiplier,
+                              int(self.base_health * health_multiplier))
     
-    def take_damage(self, amount):
-        self.health -= amount
-        return self.health <= 0
-    
-    def update(self, player_pos, dt):
-        dx = player_pos[0] - self.sprite.x
-        dy = player_pos[1] - self.sprite.y
-        dist = math.hypot(dx, dy)
-        
-        if dist > 0:
-            dx, dy = dx/dist, dy/dist
-            self.sprite.x += dx * self.speed * dt
-            self.sprite.y += dy * self.speed * dt
-    
-    def draw(self, camera=None):
-        if camera:
-            screen.blit(self.sprite._surf, 
-                       camera.apply((self.sprite.x - self.width/2, 
-                                   self.sprite.y - self.height/2)))
-        else:
-            self.sprite.draw()
+    def render(self, batch, camera, x, y, health_fraction):
+        batch.add("inimigos", self.surf, camera.apply((x - self.width/2, y - self.height/2)))
         
         
-        health_width = 30
-        health_height = 3
-        health_x = self.sprite.x - health_width/2
-        health_y = self.sprite.y - self.height/2 - 5
-        
-        if camera:
-            screen.draw.filled_rect(
-                Rect(camera.apply((health_x, health_y)), (health_width, health_height)),
-                (255, 0, 0)
-            )
-            screen.draw.filled_rect(
-                Rect(camera.apply((health_x, health_y)), (health_width * (self.health/self.max_health), health_height)),
-                (0, 255, 0)
-            )
+        health_bar = ENEMY_HEALTH_BARS.get(health_fraction)
+        batch.add("barras", health_bar,
+                  camera.apply((x - health_bar.get_width()/2, y - self.height/2 - 5)))
 
 class CustomCursor:
     def __init__(self):
-        if os.path.exists("images/cursor.png"):
-            self.original_image = pygame.image.load("images/cursor.png").convert_alpha()
-            self.scale_factor = 0.07
-            self.image = pygame.transform.scale(
-                self.original_image,
-                (int(self.original_image.get_width() * self.scale_factor),
-                 int(self.original_image.get_height() * self.scale_factor))
-            )
-        else:
-            print("AVISO: cursor.png não encontrado - usando fallback")
-            self.image = pygame.Surface((15, 15), pygame.SRCALPHA)
-            self.image.fill((0, 255, 0, 255))
+        self.scale_factor = CURSOR_SCALE
+        self.image = ASSETS.sprite("cursor.png", self.scale_factor,
+                                   fallback_size=(15, 15), fallback_color=(0, 255, 0, 255)).surf
         
         self.pos = [0, 0]
         pygame.mouse.set_visible(False)
     
-    def update(self):
-        mouse_x, mouse_y = pygame.mouse.get_pos()
+    def update(self, mouse_pos=None):
+        mouse_x, mouse_y = mouse_pos if mouse_pos is not None else pygame.mouse.get_pos()
         smooth_factor = 0.2
         self.pos[0] += (mouse_x - self.pos[0]) * smooth_factor
         self.pos[1] += (mouse_y - self.pos[1]) * smooth_factor
     
     def draw(self):
-        screen.blit(self.image, 
-                   (self.pos[0] - self.image.get_width()//2,
-                    self.pos[1] - self.image.get_height()//2))
+        top_left = (self.pos[0] - self.image.get_width()//2,
+                    self.pos[1] - self.image.get_height()//2)
+        screen.blit(self.image, top_left)
+        return Rect(top_left, self.image.get_size())
+
+class PygameInput:
+    """Entrada real (teclado e mouse); o modo headless troca por um bot"""
+    
+    KEYS = {
+        "escape": pygame.K_ESCAPE,
+        "r": pygame.K_r,
+        "1": pygame.K_1,
+        "2": pygame.K_2,
+        "3": pygame.K_3,
+    }
+    
+    def advance(self):
+        # Teclado e mouse são lidos na hora; nada a preparar antes do tick
+        pass
+    
+    def movement(self):
+        return (keyboard.d - keyboard.a, keyboard.s - keyboard.w)
+    
+    def mouse_pos(self):
+        return pygame.mouse.get_pos()
+    
+    def mouse_pressed(self):
+        return pygame.mouse.get_pressed()[0]
+    
+    def pressed(self, key):
+        return pygame.key.get_pressed()[self.KEYS[key]]
 
 class Button:
     def __init__(self, x, y, width, height, text, color=(100, 100, 255), hover_color=(150, 150, 255)):
@@ -355,7 +454,8 @@ class Button:
     def draw(self):
         color = self.hover_color if self.is_hovered else self.color
         screen.draw.filled_rect(self.rect, color)
-        screen.draw.text(
+        TEXT.draw(
+            screen,
             self.text,
             center=self.rect.center,
             fontsize=24,
@@ -370,104 +470,202 @@ class Button:
         return self.is_hovered and click
 
 class Game:
-    def __init__(self):
-        
+    def __init__(self, async_loading=ASYNC_LOADING):
+        # Tempos de carga contam a partir daqui, não do import do módulo
+        self.created = time.perf_counter()
         self.music_enabled = True
         self.sound_enabled = True
-        self.load_sounds()
+        self.voices = VoiceManager(AUDIO_CHANNELS, SOUND_COALESCE_WINDOW)
+        self.music_loaded = self.load_music()
+        self.play_music()
         
         
         self.menu_video = None
         self.menu_video_playing = False
         self.menu_video_restart_time = 0
+        self.menu_video_available = False
         
         
-        if os.path.exists("images/background.png"):
-            self.background = pygame.image.load("images/background.png").convert()
-            self.background_width = self.background.get_width()
-            self.background_height = self.background.get_height()
-        else:
-            print("AVISO: background.png não encontrado - usando fundo branco")
-            self.background = None
-        
-        if os.path.exists("images/colisaobackground.png"):
-            self.collision_map = pygame.image.load("images/colisaobackground.png").convert()
-        else:
-            print("AVISO: colisaobackground.png não encontrado - sem colisões")
-            self.collision_map = None
+        self.dirty_rects = DirtyRects(DIRTY_RECTS)
+        self.sprite_batch = SpriteBatch(("jogador", "inimigos", "projeteis", "barras"),
+                                        (0, 0, WIDTH, HEIGHT))
         
        
+        self.input = PygameInput()
         self.camera = Camera()
-        self.player = Player()
-        self.camera.follow(self.player)
-        self.cursor = CustomCursor()
-        self.enemies = []
-        self.projectiles = []
+        self.render_camera = Camera()
+        self.enemy_store = create_enemy_store(USE_NUMPY_ENEMIES)
+        self.enemy_lod = None
+        if ENEMY_LOD:
+            self.enemy_lod = SimulationLOD(LOD_NEAR_RADIUS, LOD_FAR_RADIUS,
+                                           LOD_MID_INTERVAL, LOD_FAR_INTERVAL)
+        self.enemy_pool = Pool(Enemy, ENEMY_POOL_SIZE)
+        self.projectiles = Pool(Projectile, PROJECTILE_POOL_SIZE)
+        # Cria todos os objetos agora para não alocar no meio da partida
+        self.enemy_pool.prefill()
+        self.projectiles.prefill()
+        self.enemy_grid = SpatialHash(COLLISION_CELL_SIZE)
+        self.particles = ParticleSystem(PARTICLE_COLORS, PARTICLE_CAPACITY, PARTICLE_EMIT_PER_TICK,
+                                        PARTICLE_DRAW_LIMIT, PARTICLE_TIME_BUDGET)
+        self.spawner = SpawnScheduler(SPAWNS_PER_FRAME, SPAWN_TIME_BUDGET)
+        self.recorder = None
+        # Co-op: [(Player, entrada)] além do self.player; num cliente de rede
+        # a simulação fica no servidor e self.net espelha os snapshots
+        self.guests = []
+        self.net = None
+        self.next_uid = 0
         
         
         self.spawn_timer = 0
-        self.shoot_cooldown = 0
+        self.profiler = FrameProfiler(enabled=PROFILER_ENABLED)
+        self.show_profiler = False
+        self.fixed_dt = 1.0 / SIMULATION_HZ
+        self.accumulator = 0.0
+        self.alpha = 1.0
         self.SHOOT_COOLDOWN_TIME = 0.2  
         
         
-        self.state = GameState.MENU
+        self.state = GameState.LOADING
         self.wave = 1
         self.enemies_killed = 0
+        self.total_kills = 0
         self.enemies_to_next_wave = 10
         self.available_upgrades = []
         self.difficulty_multiplier = 1.0
         self.wave_in_progress = False
         
         
+        hud_line = line_height()
+        self.hud = {
+            name: HudField(TEXT, template, topleft=(15, 15 + i * hud_line), color="black")
+            for i, (name, template) in enumerate([
+                ("player", "Player: ({}, {})"),
+                ("vida", "Vida: {}/{}"),
+                ("inimigos", "Inimigos: {}"),
+                ("wave", "Wave: {}"),
+                ("matados", "Matados: {}/{}"),
+            ])
+        }
+        
+        
         self.play_button = Button(WIDTH//2, HEIGHT//2, 200, 50, "Jogar")
         self.music_button = Button(WIDTH//2, HEIGHT//2 + 70, 200, 50, "Desligar Musica")
         self.quit_button = Button(WIDTH//2, HEIGHT//2 + 140, 200, 50, "Sair")
         
         
-        if self.music_enabled and hasattr(self, 'background_music'):
-            self.background_music.play(-1)  
+        # Imagens, sons e mapa de colisão chegam pelas threads do loader;
+        # enquanto isso o jogo fica em LOADING desenhando a barra de progresso
+        self.first_frame_time = None
+        self.ready_time = None
+        self.loader = self.start_loading()
+        if not async_loading:
+            self.loader.wait()
+            self.finish_loading()
+    
+    @property
+    def enemies(self):
+        return self.enemy_store.views
+    
+    def start_loading(self):
+        loader = AssetLoader(LOADER_THREADS)
+        for name in PRELOAD_IMAGES:
+            # O que já vem pronto do pacote de sprites não precisa do PNG
+            if ASSETS.pack is not None and ASSETS.pack.has(name):
+                continue
+            loader.submit(name, ASSETS.load, name,
+                          finish=lambda image, name=name: ASSETS.add_image(name, image))
+        for name, (path, volume, _) in SOUND_FILES.items():
+            loader.submit(name, self.load_sound, path, volume)
+        # Com o mapa em pedaços, fundo e colisão vêm do ChunkStreamer sob demanda
+        self.world = ChunkStreamer.open(WORLD_DIR, FLOW_FIELD_CELL_SIZE, WORLD_CACHE_BYTES,
+                                        WORLD_PLACEHOLDER_COLOR, WORLD_WRAP)
+        if self.world is None:
+            loader.submit("background", ASSETS.load, "background.png", finish=pygame.Surface.convert)
+            loader.submit("collision_map", self.load_collision_map)
+        loader.submit("menu_video", self.load_menu_video, finish=self.prepare_menu_video)
+        return loader
+    
+    def finish_loading(self):
+        """Monta o que depende dos assets carregados e vai para o menu"""
+        loader = self.loader
+        for name, (_, _, category) in SOUND_FILES.items():
+            setattr(self, name, loader.get(name))
+            self.voices.register(getattr(self, name), category)
+        
+        if self.world is not None:
+            self.background_chunks = self.world.background
+            self.collision_map = self.world.walkability
+            self.flow_field = self.world.flow_field()
+        else:
+            self.background = loader.get("background")
+            if self.background is not None:
+                self.background_width = self.background.get_width()
+                self.background_height = self.background.get_height()
+                self.background_chunks = ChunkedBackground(self.background, (WIDTH, HEIGHT),
+                                                           BACKGROUND_CHUNK_CACHE)
+            else:
+                print("AVISO: background.png não encontrado - usando fundo branco")
+                self.background_chunks = None
+            
+            self.collision_map, self.flow_field = loader.get("collision_map", (None, None))
+        
+        self.player = Player()
+        self.camera.follow(self.player)
+        if self.world is not None:
+            # Os pedaços do começo já vão chegando enquanto o menu está aberto
+            self.world.request(self.camera.view_rect(WORLD_PREFETCH_MARGIN))
+        if NET_SERVER:
+            self.join_server(NET_SERVER)
+        self.cursor = CustomCursor()
         
+        self.state = GameState.MENU
+        self.ready_time = time.perf_counter() - self.created
+        print(f"Assets carregados em {loader.elapsed * 1000:.0f} ms "
+              f"({loader.total} arquivos, pronto em {self.ready_time * 1000:.0f} ms)")
+    
+    def load_collision_map(self):
+        if not os.path.exists(COLLISION_MAP_FILE):
+            print("AVISO: colisaobackground.png não encontrado - sem colisões")
+            return None
         
-        self.load_menu_video() #tentei carregar um video na tela de menu mas nao consegui a tempo
+        collision_map = WalkabilityGrid.load(COLLISION_MAP_FILE)
+        return collision_map, FlowField(collision_map, FLOW_FIELD_CELL_SIZE)
     
     def load_menu_video(self):
         """Tenta carregar o vídeo do menu de forma alternativa"""
-        try:
-            
-            video_path = "video/telamenu.mp4"
-            if os.path.exists(video_path):
-                
-                self.menu_video_surface = pygame.Surface((WIDTH, HEIGHT)).convert()
-                
-                self.menu_video_image = pygame.image.load(video_path).convert()
-                self.menu_video_image = pygame.transform.scale(self.menu_video_image, (WIDTH, HEIGHT))
-                self.menu_video_available = True
-            else:
-                print("AVISO: Vídeo do menu não encontrado")
-                self.menu_video_available = False
-        except Exception as e:
-            print(f"Erro ao carregar vídeo do menu: {e}")
-            self.menu_video_available = False
+        #tentei carregar um video na tela de menu mas nao consegui a tempo
+        video_path = "video/telamenu.mp4"
+        if os.path.exists(video_path):
+            return pygame.image.load(video_path)
+        print("AVISO: Vídeo do menu não encontrado")
+        return None
     
-    def load_sounds(self):
-        
+    def prepare_menu_video(self, image):
+        self.menu_video_surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+        self.menu_video_image = pygame.transform.scale(image.convert(), (WIDTH, HEIGHT))
+        self.menu_video_available = True
+        return self.menu_video_image
+    
+    def load_music(self):
+        """Música tocada em streaming pelo mixer.music, sem decodificar o mp3 inteiro"""
+        if not os.path.exists(MUSIC_FILE):
+            print("AVISO: background.mp3 não encontrado")
+            return False
         try:
-            
-            if os.path.exists("music/background.mp3"):
-                self.background_music = pygame.mixer.Sound("music/background.mp3")
-                self.background_music.set_volume(0.5)
-            else:
-                print("AVISO: background.mp3 não encontrado")
-            
-            
-            self.menu_click_sound = self.load_sound("sounds/botaomenu.mp3", volume=0.3)
-            self.shoot_sound = self.load_sound("sounds/tiro.mp3", volume=0.2)  # Volume mais baixo
-            self.enemy_spawn_sound = self.load_sound("sounds/inimigo.mp3", volume=0.3)
-            self.death_sound = self.load_sound("sounds/morte.mp3", volume=0.4)
-            
+            pygame.mixer.music.load(MUSIC_FILE)
+            pygame.mixer.music.set_volume(MUSIC_VOLUME)
         except Exception as e:
-            print(f"Erro ao carregar sons: {e}")
-            self.sound_enabled = False
+            print(f"Erro ao carregar música: {e}")
+            return False
+        return True
+    
+    def play_music(self):
+        if self.music_enabled and self.music_loaded and not pygame.mixer.music.get_busy():
+            pygame.mixer.music.play(-1)
+    
+    def stop_music(self):
+        if self.music_loaded:
+            pygame.mixer.music.stop()
     
     def load_sound(self, path, volume=1.0):
         if os.path.exists(path):
@@ -479,16 +677,21 @@ class Game:
     
     def play_sound(self, sound):
         if self.sound_enabled and sound:
-            sound.play()
+            self.voices.play(sound)
     
     def reset(self):
         self.player = Player()
+        self.guests = [(Player(), controls) for _, controls in self.guests]
         self.camera.follow(self.player)
-        self.enemies = []
-        self.projectiles = []
+        self.enemy_store.clear()
+        self.enemy_pool.clear()
+        self.projectiles.clear()
+        self.spawner.clear()
+        self.particles.clear()
         self.state = GameState.PLAYING
         self.wave = 1
         self.enemies_killed = 0
+        self.total_kills = 0
         self.enemies_to_next_wave = 10
         self.difficulty_multiplier = 1.0
         self.wave_in_progress = False
@@ -496,49 +699,172 @@ class Game:
     def spawn_wave(self):
         self.wave_in_progress = True
         num_enemies = min(5 + self.wave, MAX_ENEMIES)
-        health_multiplier = 1.0 + (self.wave * 0.1)
-        speed_multiplier = 1.0 + (self.wave * 0.05)
-        
-        for _ in range(num_enemies):
-            self.enemies.append(Enemy(
-                self.player.pos,
-                health_multiplier,
-                speed_multiplier
-            ))
+        health_multiplier = 1.0 + (self.wave * WAVE_HEALTH_SCALING)
+        speed_multiplier = 1.0 + (self.wave * WAVE_SPEED_SCALING)
+        
+        # Os inimigos entram na fila e nascem alguns por frame
+        pattern = WAVE_PATTERNS[(self.wave - 1) % len(WAVE_PATTERNS)]
+        self.spawner.schedule(pattern, num_enemies, SPAWN_DISTANCE,
+                              health_multiplier, speed_multiplier)
+    
+    def spawn_enemy(self, offset_x, offset_y, health_multiplier, speed_multiplier):
+        anchor = (self.living_players() or [self.player])[0]
+        enemy = self.enemy_pool.acquire(
+            self.enemy_store,
+            anchor.pos[0] + offset_x,
+            anchor.pos[1] + offset_y,
+            health_multiplier,
+            speed_multiplier
+        )
+        if enemy is not None:
+            enemy.uid = self.new_uid()
             self.play_sound(self.enemy_spawn_sound)
     
+    def new_uid(self):
+        """Identificador estável de inimigos e projéteis para os snapshots de rede"""
+        self.next_uid += 1
+        return self.next_uid
+    
+    def add_player(self, controls):
+        """Mais um jogador no co-op, com a sua própria entrada; devolve o Player"""
+        player = Player()
+        self.guests.append((player, controls))
+        return player
+    
+    def all_players(self):
+        return [self.player] + [player for player, _ in self.guests]
+    
+    def living_players(self):
+        return [player for player in self.all_players() if player.health > 0]
+    
+    def controlled_players(self):
+        """(Player, entrada) de todos os jogadores, o self.player primeiro"""
+        return [(self.player, self.input)] + self.guests
+    
+    def any_pressed(self, key):
+        return any(controls.pressed(key) for _, controls in self.controlled_players())
+    
+    def player_view(self, player, margin=0):
+        """Camera.view_rect() da tela de um jogador qualquer"""
+        if player is self.player:
+            return self.camera.view_rect(margin)
+        camera = Camera()
+        camera.center_on(player.pos)
+        return camera.view_rect(margin)
+    
+    def join_server(self, address):
+        self.net = CoopClient(address, list(UpgradeType))
+        print(f"Entrando no co-op em {address}")
+    
+    def leave_server(self):
+        if self.net is not None:
+            self.net.close()
+            self.net = None
+        self.guests = []
+    
+    def shutdown(self):
+        """Fecha a conexão do co-op e a thread de leitura do mapa"""
+        self.leave_server()
+        if self.world is not None:
+            self.world.close()
+    
+    def on_projectile_fired(self, proj):
+        self.particles.emit(proj.x, proj.y, 4, "faisca", speed=(80, 200), life=(0.05, 0.15),
+                            direction=math.atan2(proj.vy, proj.vx), spread=0.6)
+    
+    def on_enemy_hit(self, enemy, proj):
+        # Espirra para o lado de onde o tiro veio
+        self.particles.emit(proj.x, proj.y, 6, "faisca", speed=(60, 160), life=(0.1, 0.3),
+                            direction=math.atan2(-proj.vy, -proj.vx), spread=1.8)
+    
+    def on_enemy_killed(self, enemy):
+        self.particles.emit(enemy.x, enemy.y, 18, "sangue", speed=(30, 140), life=(0.3, 0.7), size=3)
+        self.particles.emit(enemy.x, enemy.y, 8, "poeira", speed=(10, 60), life=(0.4, 0.9))
+    
+    def flush_spawns(self):
+        """Cria na hora tudo o que ainda está na fila de spawn"""
+        return self.spawner.flush(self.spawn_enemy)
+    
     def generate_upgrades(self):
         self.available_upgrades = random.sample(list(UpgradeType), 3)
     
     def apply_upgrade(self, upgrade_type):
-        if upgrade_type == UpgradeType.DAMAGE:
-            self.player.damage_multiplier += 0.5
-        elif upgrade_type == UpgradeType.HEALTH:
-            self.player.max_health += 20
-            self.player.heal(20)
-        elif upgrade_type == UpgradeType.SPEED:
-            self.player.speed *= 1.2
-        elif upgrade_type == UpgradeType.FIRE_RATE:
-            self.player.fire_rate_multiplier *= 1.25
-        elif upgrade_type == UpgradeType.VAMPIRE:
-            self.player.vampirism += 0.1
-        
+        # No co-op o upgrade escolhido vale para todos
+        for player in self.all_players():
+            if upgrade_type == UpgradeType.DAMAGE:
+                player.damage_multiplier += 0.5
+            elif upgrade_type == UpgradeType.HEALTH:
+                player.max_health += 20
+                if player.health > 0:  # quem caiu continua caído
+                    player.heal(20)
+            elif upgrade_type == UpgradeType.SPEED:
+                player.speed *= 1.2
+            elif upgrade_type == UpgradeType.FIRE_RATE:
+                player.fire_rate_multiplier *= 1.25
+            elif upgrade_type == UpgradeType.VAMPIRE:
+                player.vampirism += 0.1
+        
+        self.start_wave(self.wave + 1)
+    
+    def start_wave(self, wave):
+        """Vai para a wave dada, com a meta de abates e a dificuldade dela"""
         self.state = GameState.PLAYING
-        self.wave += 1
+        self.wave = wave
         self.enemies_killed = 0
         self.enemies_to_next_wave = 10 + self.wave * 2
         self.difficulty_multiplier = 1.0 + self.wave * 0.1
         self.spawn_wave()
     
     def update(self, dt):
-        self.cursor.update()
+        """Avança a simulação em passos fixos; o que sobra vira interpolação"""
+        self.profiler.begin_frame()
+        self.accumulator += dt
+        steps = 0
+        while self.accumulator >= self.fixed_dt and steps < MAX_CATCH_UP_STEPS:
+            self.advance_inputs()
+            self.tick(self.fixed_dt)
+            if self.recorder is not None:
+                self.recorder.record_tick(self)
+            self.accumulator -= self.fixed_dt
+            steps += 1
+        
+        # Frame muito lento: descarta o atraso em vez de entrar em espiral
+        if self.accumulator >= self.fixed_dt:
+            self.accumulator = 0.0
+        self.alpha = self.accumulator / self.fixed_dt
+    
+    def advance_inputs(self):
+        self.input.advance()
+        # Jogadores espelhados de um servidor não têm entrada local (None)
+        for _, controls in self.guests:
+            if controls is not None:
+                controls.advance()
+    
+    def tick(self, dt):
+        if self.state == GameState.LOADING:
+            if self.loader.poll():
+                self.finish_loading()
+            return
+        
+        controls = self.input
+        self.cursor.update(controls.mouse_pos())
+        
+        if self.net is not None:
+            if controls.pressed("escape"):
+                self.leave_server()
+                self.state = GameState.MENU
+                self.play_music()
+                return
+            with self.profiler.section("rede"):
+                self.net.update(self, dt)
+            self.update_world()
+            return
         
         
         if self.state in [GameState.PLAYING, GameState.UPGRADE_SELECTION]:
-            if pygame.key.get_pressed()[pygame.K_ESCAPE]:
+            if controls.pressed("escape"):
                 self.state = GameState.MENU
-                if self.music_enabled and hasattr(self, 'background_music'):
-                    self.background_music.play(-1)
+                self.play_music()
                 return
         
         if self.state == GameState.MENU:
@@ -548,7 +874,7 @@ class Game:
                 self.menu_video_restart_time = 0
             
            
-            mouse_pos = pygame.mouse.get_pos()
+            mouse_pos = controls.mouse_pos()
             self.play_button.check_hover(mouse_pos)
             self.music_button.check_hover(mouse_pos)
             self.quit_button.check_hover(mouse_pos)
@@ -559,86 +885,130 @@ class Game:
             return
         
         elif self.state == GameState.GAME_OVER:
-            if keyboard.r:
+            if self.any_pressed("r"):
                 self.reset()
             return
         
         elif self.state == GameState.UPGRADE_SELECTION:
             
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_1]:
+            if self.any_pressed("1"):
                 self.apply_upgrade(self.available_upgrades[0])
-            elif keys[pygame.K_2]:
+            elif self.any_pressed("2"):
                 self.apply_upgrade(self.available_upgrades[1])
-            elif keys[pygame.K_3]:
+            elif self.any_pressed("3"):
                 self.apply_upgrade(self.available_upgrades[2])
             return
         
         
-        self.player.update(dt, self.collision_map)
-        self.camera.follow(self.player)
+        with self.profiler.section("player"):
+            for player, player_controls in self.controlled_players():
+                if player.health > 0:
+                    player.update(dt, self.collision_map, player_controls.movement())
+            self.camera.follow(self.player)
         
         
-        self.shoot_cooldown -= dt
-        mouse_click = pygame.mouse.get_pressed()[0]
-        if mouse_click and self.shoot_cooldown <= 0:
-            self.shoot_cooldown = self.SHOOT_COOLDOWN_TIME / self.player.fire_rate_multiplier
-            mouse_x, mouse_y = pygame.mouse.get_pos()
-            world_mouse_x = mouse_x + self.camera.offset_x
-            world_mouse_y = mouse_y + self.camera.offset_y
-            self.projectiles.append(
-                Projectile(self.player.pos[0], self.player.pos[1], 
-                          world_mouse_x, world_mouse_y)
-            )
-            self.play_sound(self.shoot_sound)
+        self.update_world()
         
         
-        for proj in self.projectiles[:]:
-            if proj.update(dt):
-                self.projectiles.remove(proj)
+        with self.profiler.section("projeteis"):
+            for player, player_controls in self.controlled_players():
+                if player.health > 0:
+                    self.update_shooting(player, player_controls, dt)
         
         
-        enemies_to_remove = []
-        projectiles_to_remove = []
+            views = [self.player_view(player, PROJECTILE_CULL_MARGIN) for player in self.living_players()]
+            self.projectiles.release_where(lambda proj: proj.update(dt, views))
         
-        for enemy in self.enemies[:]:
-            enemy.update(self.player.pos, dt)
-            
-            
-            for proj in self.projectiles[:]:
-                if proj.collides_with(enemy):
-                    damage = PROJECTILE_DAMAGE * self.player.damage_multiplier
-                    if enemy.take_damage(damage):
-                        enemies_to_remove.append(enemy)
-                        self.enemies_killed += 1
-                        
-                        
-                        if self.player.vampirism > 0:
-                            self.player.heal(damage * self.player.vampirism)
+        
+        with self.profiler.section("spawns"):
+            self.spawner.update(dt, self.spawn_enemy)
+        
+        
+        with self.profiler.section("inimigos"):
+            store = self.enemy_store
+            store.snapshot()
+            targets = self.living_players()
+            if len(targets) > 1:
+                # Co-op: cada inimigo vai atrás do jogador vivo mais perto
+                points = [player.pos for player in targets]
+                if self.flow_field is not None:
+                    self.flow_field.update_many(points)
+                target_x, target_y = store.closest_targets(points)
+            else:
+                target = (targets or [self.player])[0]
+                if self.flow_field is not None:
+                    self.flow_field.update(target.pos[0], target.pos[1])
+                target_x, target_y = target.pos
+            store.seek(target_x, target_y, dt, self.flow_field, self.enemy_lod)
+        
+        
+        with self.profiler.section("grade"):
+            grid = self.enemy_grid
+            grid.clear()
+            # Projéteis só existem perto da tela, então quem está longe fica fora da grade
+            if self.enemy_lod is not None and not self.guests:
+                views, xs, ys = store.near(self.player.pos[0], self.player.pos[1], LOD_NEAR_RADIUS)
+            else:
+                views = store.views
+                xs, ys = store.positions()
+            for enemy, x, y in zip(views, xs, ys):
+                grid.insert(enemy, x, y, enemy.width/2, enemy.height/2)
+        
+        
+        with self.profiler.section("colisoes"):
+            hit_slots = []
+            hit_damage = []
+            hit_enemies = set()
+            projectiles_to_remove = []
+            damage = PROJECTILE_DAMAGE * self.player.damage_multiplier
+            for proj in self.projectiles:
+                for enemy in grid.query_entity(proj):
+                    if id(enemy) in hit_enemies or not circles_overlap(proj, enemy):
+                        continue
+                    if proj.collides_with(enemy):
+                        hit_enemies.add(id(enemy))
+                        hit_slots.append(enemy.slot)
+                        hit_damage.append(damage)
+                        projectiles_to_remove.append(proj)
+                        self.on_enemy_hit(enemy, proj)
+                        break
+        
+            killed = store.damage_many(hit_slots, hit_damage)
+            for slot in killed:
+                self.on_enemy_killed(store.views[slot])
+            self.enemies_killed += len(killed)
+            self.total_kills += len(killed)
+            for player in self.living_players():
+                if player.vampirism > 0:
+                    for _ in killed:
+                        player.heal(damage * player.vampirism)
+        
+        
+            for player in self.living_players():
+                for enemy in grid.query(player.pos[0], player.pos[1], player.width/2, player.height/2):
+                    if (abs(player.pos[0] - enemy.x) < (player.width/2 + enemy.width/2) and
+                        abs(player.pos[1] - enemy.y) < (player.height/2 + enemy.height/2)):
                     
-                    projectiles_to_remove.append(proj)
-                    break
-            
-            
-            if (abs(self.player.pos[0] - enemy.sprite.x) < (self.player.width/2 + enemy.width/2) and
-                abs(self.player.pos[1] - enemy.sprite.y) < (self.player.height/2 + enemy.height/2)):
-                
-                if self.player.take_damage(10):
-                    if self.player.health <= 0:
-                        self.state = GameState.GAME_OVER
-                        self.play_sound(self.death_sound)
+                        if player.take_damage(10):
+                            if player.health <= 0:
+                                self.play_sound(self.death_sound)
+                                # No co-op quem cai fica parado; acaba quando todos caem
+                                if not self.living_players():
+                                    self.state = GameState.GAME_OVER
         
         
-        for enemy in enemies_to_remove:
-            if enemy in self.enemies:
-                self.enemies.remove(enemy)
+            for enemy in store.compact():
+                self.enemy_pool.release(enemy)
         
-        for proj in projectiles_to_remove:
-            if proj in self.projectiles:
-                self.projectiles.remove(proj)
+            for proj in projectiles_to_remove:
+                self.projectiles.release(proj)
         
         
-        if self.wave_in_progress and len(self.enemies) == 0:
+        with self.profiler.section("particulas"):
+            self.particles.update(dt)
+        
+        
+        if self.wave_in_progress and len(self.enemies) == 0 and not self.spawner.pending:
             if self.enemies_killed >= self.enemies_to_next_wave:
                 self.generate_upgrades()
                 self.state = GameState.UPGRADE_SELECTION
@@ -653,6 +1023,33 @@ class Game:
         if not self.wave_in_progress and self.state == GameState.PLAYING:
             self.spawn_wave()
     
+    def update_world(self):
+        if self.world is None:
+            return
+        with self.profiler.section("mundo"):
+            self.world.request(self.camera.view_rect(WORLD_PREFETCH_MARGIN))
+            if self.world.poll():
+                # Pedaço novo no lugar da cor de espera: a tela inteira precisa redesenhar
+                self.dirty_rects.invalidate()
+    
+    def update_shooting(self, player, controls, dt):
+        player.shoot_cooldown -= dt
+        mouse_click = controls.mouse_pressed()
+        if mouse_click and player.shoot_cooldown <= 0:
+            player.shoot_cooldown = self.SHOOT_COOLDOWN_TIME / player.fire_rate_multiplier
+            # A mira vem em coordenadas da tela de quem atira, centrada nele
+            offset_x = player.pos[0] - WIDTH // 2
+            offset_y = player.pos[1] - HEIGHT // 2
+            mouse_x, mouse_y = controls.mouse_pos()
+            world_mouse_x = mouse_x + offset_x
+            world_mouse_y = mouse_y + offset_y
+            proj = self.projectiles.acquire(player.pos[0], player.pos[1],
+                                            world_mouse_x, world_mouse_y)
+            if proj is not None:
+                proj.uid = self.new_uid()
+                self.play_sound(self.shoot_sound)
+                self.on_projectile_fired(proj)
+    
     def draw_menu(self):
         
         if self.menu_video_available:
@@ -666,13 +1063,15 @@ class Game:
         screen.draw.filled_rect(Rect((0, 0), (WIDTH, HEIGHT)), (0, 0, 0, 128))
         
         
-        screen.draw.text(
+        TEXT.draw(
+            screen,
             "KODLAND SURVIVAL",
             center=(WIDTH//2, HEIGHT//4),
             fontsize=64,
             color="white"
         )
-        screen.draw.text(
+        TEXT.draw(
+            screen,
             "por Luiz Henrique",
             center=(WIDTH//2, HEIGHT//3),
             fontsize=30,
@@ -685,94 +1084,193 @@ class Game:
         self.quit_button.draw()
         
         # Instruções
-        screen.draw.text(
+        TEXT.draw(
+            screen,
             "Pressione ESC durante o jogo para voltar ao menu",
             center=(WIDTH//2, HEIGHT - 30),
             fontsize=20,
             color="white"
         )
     
+    def draw_loading(self):
+        screen.fill((0, 0, 0))
+        TEXT.draw(
+            screen,
+            "KODLAND SURVIVAL",
+            center=(WIDTH//2, HEIGHT//4),
+            fontsize=64,
+            color="white"
+        )
+        
+        bar = Rect(0, 0, 400, 20)
+        bar.center = (WIDTH//2, HEIGHT//2)
+        screen.draw.rect(bar, "white")
+        filled = bar.inflate(-6, -6)
+        filled.width = int(filled.width * self.loader.progress())
+        screen.draw.filled_rect(filled, "white")
+        TEXT.draw(
+            screen,
+            f"Carregando... {self.loader.done}/{self.loader.total}",
+            center=(WIDTH//2, HEIGHT//2 + 40),
+            fontsize=24,
+            color="white"
+        )
+    
     def draw(self):
+        if self.first_frame_time is None:
+            self.first_frame_time = time.perf_counter() - self.created
+            print(f"Primeiro frame em {self.first_frame_time * 1000:.0f} ms")
+        
+        dirty = self.dirty_rects
+        if self.state == GameState.LOADING:
+            self.draw_loading()
+            self.profiler.end_frame()
+            return
+        
         if self.state == GameState.MENU:
             self.draw_menu()
             self.cursor.draw()
+            dirty.invalidate()
+            self.profiler.end_frame()
             return
         
-        if self.background:
-            bg_x = -self.camera.offset_x % self.background_width - self.background_width
-            bg_y = -self.camera.offset_y % self.background_height - self.background_height
-            
-            for y in range(0, HEIGHT + self.background_height, self.background_height):
-                for x in range(0, WIDTH + self.background_width, self.background_width):
-                    screen.blit(self.background, (bg_x + x, bg_y + y))
-        else:
-            screen.fill("white")
+        camera = self.render_camera
+        camera.center_on(self.player.render_pos(self.alpha))
+        
+        with self.profiler.section("fundo"):
+            full_redraw = dirty.begin_frame(camera.offset_x, camera.offset_y, self.state)
+            if self.background_chunks is None:
+                screen.fill("white")
+            elif full_redraw:
+                self.background_chunks.draw(screen.surface, camera.offset_x, camera.offset_y)
+            else:
+                self.background_chunks.restore(screen.surface, camera.offset_x, camera.offset_y,
+                                               dirty.previous)
         
         if self.state == GameState.PLAYING:
-            self.player.draw(self.camera)
-            
-            for enemy in self.enemies:
-                enemy.draw(self.camera)
+            with self.profiler.section("entidades"):
+                batch = self.sprite_batch
+                batch.clear()
+                for player in self.all_players():
+                    player.render(batch, camera, self.alpha)
+                
+                view = camera.view_rect(RENDER_CULL_MARGIN)
+                for enemy, x, y, health in self.enemy_store.visible(view, self.alpha):
+                    enemy.render(batch, camera, x, y, health)
+                
+                for proj in self.projectiles:
+                    proj.render(batch, camera, self.alpha)
+                
+                for rect in batch.flush(screen.surface):
+                    dirty.add(rect)
             
-            for proj in self.projectiles:
-                proj.draw(self.camera)
+            with self.profiler.section("particulas"):
+                dirty.add(self.particles.draw(screen.surface, camera.offset_x, camera.offset_y))
             
             
-            screen.draw.filled_rect(Rect((10, 10), (220, 110)), (240, 240, 240, 220))
-            screen.draw.text(
-                f"Player: ({int(self.player.pos[0])}, {int(self.player.pos[1])})\n"
-                f"Vida: {self.player.health}/{self.player.max_health}\n"
-                f"Inimigos: {len(self.enemies)}\n"
-                f"Wave: {self.wave}\n"
-                f"Matados: {self.enemies_killed}/{self.enemies_to_next_wave}",
-                topleft=(15, 15),
-                color="black"
-            )
-            screen.draw.text("WASD para mover | Clique para atirar", bottomleft=(10, HEIGHT-10), color="black")
-            screen.draw.text("ESC para menu", bottomright=(WIDTH-10, HEIGHT-10), color="black")
+            with self.profiler.section("hud"):
+                screen.draw.filled_rect(Rect((10, 10), (220, 110)), (240, 240, 240, 220))
+                hud = self.hud
+                hud["player"].draw(screen, int(self.player.pos[0]), int(self.player.pos[1]))
+                hud["vida"].draw(screen, self.player.health, self.player.max_health)
+                hud["inimigos"].draw(screen, len(self.enemies))
+                hud["wave"].draw(screen, self.wave)
+                hud["matados"].draw(screen, self.enemies_killed, self.enemies_to_next_wave)
+                dirty.add(TEXT.draw(screen, "WASD para mover | Clique para atirar", bottomleft=(10, HEIGHT-10), color="black"))
+                dirty.add(TEXT.draw(screen, "ESC para menu", bottomright=(WIDTH-10, HEIGHT-10), color="black"))
         
         elif self.state == GameState.GAME_OVER:
             screen.draw.filled_rect(Rect((WIDTH//2 - 150, HEIGHT//2 - 100), (300, 200)), (50, 50, 50, 200))
-            screen.draw.text("GAME OVER", center=(WIDTH//2, HEIGHT//2 - 50), fontsize=48, color="red")
-            screen.draw.text(f"Wave alcancada: {self.wave}", center=(WIDTH//2, HEIGHT//2), fontsize=24, color="white")
-            screen.draw.text("Pressione R para reiniciar", center=(WIDTH//2, HEIGHT//2 + 50), fontsize=24, color="white")
+            TEXT.draw(screen, "GAME OVER", center=(WIDTH//2, HEIGHT//2 - 50), fontsize=48, color="red")
+            TEXT.draw(screen, f"Wave alcancada: {self.wave}", center=(WIDTH//2, HEIGHT//2), fontsize=24, color="white")
+            TEXT.draw(screen, "Pressione R para reiniciar", center=(WIDTH//2, HEIGHT//2 + 50), fontsize=24, color="white")
         
         elif self.state == GameState.UPGRADE_SELECTION:
             screen.draw.filled_rect(Rect((WIDTH//2 - 200, HEIGHT//2 - 150), (400, 300)), (50, 50, 100, 200))
-            screen.draw.text("ESCOLHA UM UPGRADE", center=(WIDTH//2, HEIGHT//2 - 120), fontsize=32, color="white")
+            TEXT.draw(screen, "ESCOLHA UM UPGRADE", center=(WIDTH//2, HEIGHT//2 - 120), fontsize=32, color="white")
             
             for i, upgrade in enumerate(self.available_upgrades):
                 y_pos = HEIGHT//2 - 70 + i * 60
-                screen.draw.text(
+                TEXT.draw(
+                    screen,
                     f"{i+1}. {upgrade.value}",
                     center=(WIDTH//2, y_pos),
                     fontsize=24,
                     color="yellow" if i == 0 else "cyan" if i == 1 else "magenta"
                 )
-            screen.draw.text("Pressione 1, 2 ou 3 para selecionar", center=(WIDTH//2, HEIGHT//2 + 100), fontsize=20, color="white")
-        
-        self.cursor.draw()
+            TEXT.draw(screen, "Pressione 1, 2 ou 3 para selecionar", center=(WIDTH//2, HEIGHT//2 + 100), fontsize=20, color="white")
+        
+        if self.show_profiler:
+            dirty.add(self.profiler.draw_overlay(screen))
+        
+        dirty.add(self.cursor.draw())
+        dirty.end_frame()
+        lod_near, lod_mid, lod_far = self.enemy_store.tier_counts
+        self.profiler.end_frame(inimigos=len(self.enemies), projeteis=len(self.projectiles),
+                                vozes=self.voices.active(), particulas=self.particles.alive,
+                                desenhados=self.sprite_batch.submitted, descartados=self.sprite_batch.culled,
+                                pedacos=len(self.world) if self.world is not None else 0,
+                                lod_perto=lod_near, lod_medio=lod_mid, lod_longe=lod_far,
+                                spawns_adiados=self.spawner.deferred_frames,
+                                pedacos_na_hora=self.world.stalls if self.world is not None else 0)
+    
+    def start_recording(self):
+        """Começa uma partida nova gravando a entrada de cada tick"""
+        self.stop_recording()
+        self.reset()
+        self.recorder = ReplayRecorder(self)
+        print("Gravando replay (F6 para salvar)")
+    
+    def stop_recording(self, path=None):
+        if self.recorder is None:
+            return None
+        path = path or time.strftime("replay_%Y%m%d_%H%M%S.ksr")
+        log = self.recorder.stop(path)
+        self.recorder = None
+        print(f"Replay salvo em {path} ({len(log)} ticks)")
+        return log
+    
+    def export_profile(self, basename=None):
+        basename = basename or time.strftime("perfil_%Y%m%d_%H%M%S")
+        self.profiler.export_csv(basename + ".csv")
+        self.profiler.export_json(basename + ".json")
+        print(f"Perfil salvo em {basename}.csv e {basename}.json")
+
+def on_key_down(key):
+    if key == keys.F3:
+        game.show_profiler = not game.show_profiler
+    elif key == keys.F4:
+        game.export_profile()
+    elif key == keys.F5 and game.state != GameState.LOADING:
+        game.start_recording()
+    elif key == keys.F6:
+        game.stop_recording()
 
 def on_mouse_down(pos):
     if game.state == GameState.MENU:
        
         if game.play_button.is_clicked(pos, True):
             game.play_sound(game.menu_click_sound)
+            # Um reset fora do tick não entra no replay: a gravação termina aqui
+            game.stop_recording()
             game.reset()
         elif game.music_button.is_clicked(pos, True):
             game.play_sound(game.menu_click_sound)
             game.music_enabled = not game.music_enabled
-            if game.music_enabled and hasattr(game, 'background_music'):
-                game.background_music.play(-1)
+            if game.music_enabled:
+                game.play_music()
             else:
-                pygame.mixer.stop()
+                game.stop_music()
         elif game.quit_button.is_clicked(pos, True):
             game.play_sound(game.menu_click_sound)
+            game.shutdown()
             pygame.quit()
             exit()
 
 
 game = Game()
+# Fechar a janela sai do loop do pgzero sem passar pelo botão de sair
+atexit.register(game.shutdown)
 
 def update(dt):
     game.update(dt)
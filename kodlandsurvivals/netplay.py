@@ -0,0 +1,792 @@
+"""Co-op local: servidor autoritativo e clientes finos por UDP
+
+    python netplay.py server --port 47800 --tick-rate 60 --snapshot-rate 20
+    KODLAND_SERVER=127.0.0.1:47800 pgzrun main.py     # cliente com janela
+    python netplay.py bots --clients 3 --seconds 60   # clientes bot sem janela
+
+Só o servidor simula: ele roda um Game sem janela com um jogador por
+cliente. Cada cliente manda a sua entrada a cada tick (o mesmo quadro do
+replay) e recebe snapshots quantizados, codificados como diferença para o
+último snapshot que ele confirmou; se a confirmação for velha demais, vai
+um snapshot completo. O cliente desenha interpolando entre os dois últimos.
+"""
+import argparse
+import math
+import select
+import socket
+import statistics
+import struct
+import sys
+import time
+import zlib
+from collections import OrderedDict, deque
+
+from replay import capture_frame, pack_frame, unpack_frame
+
+PROTOCOL_VERSION = 1
+DEFAULT_PORT = 47800
+HISTORY = 64            # snapshots guardados como base dos deltas
+POSITION_SCALE = 4      # posições em 1/4 de pixel
+MAX_DATAGRAM = 65507
+
+HELLO, WELCOME, INPUT, SNAPSHOT, BYE = range(1, 6)
+_HELLO = struct.Struct("<BH")          # tipo, versão
+_WELCOME = struct.Struct("<BBHHHH")    # tipo, slot, ticks/s, snapshots/s, largura, altura da tela
+_INPUT = struct.Struct("<BII")         # tipo, sequência, último snapshot recebido
+_SNAPSHOT = struct.Struct("<BIIB")     # tipo, tick, tick base (0 = completo), flags
+_BYE = struct.Struct("<B")
+FLAG_ZLIB = 1
+
+# Tabelas do snapshot e quantos campos (inteiros) cada entrada tem
+TABLES = (
+    ("jogo", 8),        # estado, wave, matados, meta, total, 3 upgrades oferecidos
+    ("jogadores", 6),   # x, y, vida*10, vida máxima*10, sprite, invulnerável (centésimos)
+    ("inimigos", 3),    # x, y, fração de vida (0..255)
+    ("projeteis", 3),   # x, y, ângulo em graus
+)
+IDLE_FRAME = (0, 0, 0, 0, False, ())
+
+
+def parse_address(text, default_port=DEFAULT_PORT):
+    host, _, port = text.rpartition(":")
+    if not host:
+        return text, default_port
+    return host, int(port)
+
+
+def _quantize(value):
+    return int(round(value * POSITION_SCALE))
+
+
+def capture(game, upgrades):
+    """Estado do Game em tabelas {id: (inteiros)}, pronto para codificar"""
+    offered = [upgrades.index(upgrade) + 1 for upgrade in game.available_upgrades[:3]]
+    offered += [0] * (3 - len(offered))
+    players = {}
+    for slot, player in enumerate(game.all_players()):
+        players[slot] = (
+            _quantize(player.pos[0]), _quantize(player.pos[1]),
+            int(round(player.health * 10)), int(round(player.max_health * 10)),
+            player.current_sprite,
+            int(round(player.invulnerability_timer * 100)) if player.invulnerable else 0,
+        )
+    xs, ys = game.enemy_store.positions()
+    enemies = {
+        enemy.uid: (_quantize(x), _quantize(y),
+                    max(0, min(255, int(round(255 * enemy.health / enemy.max_health)))))
+        for enemy, x, y in zip(game.enemy_store.views, xs, ys)
+    }
+    projectiles = {
+        proj.uid: (_quantize(proj.x), _quantize(proj.y), int(round(proj.angle)) % 360)
+        for proj in game.projectiles
+    }
+    return {
+        "jogo": {0: (game.state.value, game.wave, game.enemies_killed, game.enemies_to_next_wave,
+                     game.total_kills, *offered)},
+        "jogadores": players,
+        "inimigos": enemies,
+        "projeteis": projectiles,
+    }
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+def _encode_table(out, current, base, fields):
+    # Removidos, depois só quem mudou: id (diferença para o anterior),
+    # máscara dos campos e a diferença de cada campo marcado
+    zeros = (0,) * fields
+    removed = sorted(uid for uid in base if uid not in current)
+    _write_varint(out, len(removed))
+    previous = 0
+    for uid in removed:
+        _write_varint(out, uid - previous)
+        previous = uid
+
+    changed = [uid for uid in sorted(current) if base.get(uid) != current[uid]]
+    _write_varint(out, len(changed))
+    previous = 0
+    for uid in changed:
+        _write_varint(out, uid - previous)
+        previous = uid
+        values = current[uid]
+        old = base.get(uid, zeros)
+        mask = 0
+        for index in range(fields):
+            if values[index] != old[index]:
+                mask |= 1 << index
+        out.append(mask)
+        for index in range(fields):
+            if mask & (1 << index):
+                _write_varint(out, _zigzag(values[index] - old[index]))
+
+
+def _decode_table(data, offset, base, fields):
+    table = dict(base)
+    zeros = (0,) * fields
+    count, offset = _read_varint(data, offset)
+    uid = 0
+    for _ in range(count):
+        delta, offset = _read_varint(data, offset)
+        uid += delta
+        table.pop(uid, None)
+
+    count, offset = _read_varint(data, offset)
+    uid = 0
+    for _ in range(count):
+        delta, offset = _read_varint(data, offset)
+        uid += delta
+        mask = data[offset]
+        offset += 1
+        values = list(base.get(uid, zeros))
+        for index in range(fields):
+            if mask & (1 << index):
+                change, offset = _read_varint(data, offset)
+                values[index] += _unzigzag(change)
+        table[uid] = tuple(values)
+    return table, offset
+
+
+def encode_snapshot(tick, state, base_tick=0, base=None):
+    """Pacote SNAPSHOT com `state` como diferença para `base` (None = completo)"""
+    body = bytearray()
+    for name, fields in TABLES:
+        _encode_table(body, state[name], base[name] if base is not None else {}, fields)
+    flags = 0
+    compressed = zlib.compress(bytes(body), 6)
+    if len(compressed) < len(body):
+        body = compressed
+        flags |= FLAG_ZLIB
+    return _SNAPSHOT.pack(SNAPSHOT, tick, base_tick if base is not None else 0, flags) + bytes(body)
+
+
+def decode_snapshot(packet, bases):
+    """(tick, tick base, estado); levanta KeyError se a base não estiver em `bases`"""
+    _, tick, base_tick, flags = _SNAPSHOT.unpack_from(packet)
+    body = packet[_SNAPSHOT.size:]
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+    base = bases[base_tick] if base_tick else None
+    state = {}
+    offset = 0
+    for name, fields in TABLES:
+        state[name], offset = _decode_table(body, offset, base[name] if base else {}, fields)
+    return tick, base_tick, state
+
+
+class RemoteInput:
+    """Entrada de um jogador remoto: o último quadro recebido vale até chegar outro
+
+    ESC não chega ao servidor: um cliente não pode mandar a partida de
+    todos para o menu.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.sequence = -1
+        self.latest = IDLE_FRAME
+        self.current = IDLE_FRAME
+
+    def receive(self, sequence, frame):
+        # UDP pode entregar fora de ordem: quadro mais velho que o atual é ignorado
+        if sequence > self.sequence:
+            self.sequence = sequence
+            self.latest = frame
+
+    def advance(self):
+        self.current = self.latest
+
+    def movement(self):
+        return self.current[0], self.current[1]
+
+    def mouse_pos(self):
+        return self.current[2], self.current[3]
+
+    def mouse_pressed(self):
+        return self.current[4]
+
+    def pressed(self, key):
+        return key != "escape" and key in self.current[5]
+
+
+class _Client:
+    __slots__ = ("address", "slot", "ack", "last_seen", "bytes_sent")
+
+    def __init__(self, address, slot, now):
+        self.address = address
+        self.slot = slot
+        self.ack = 0
+        self.last_seen = now
+        self.bytes_sent = 0
+
+
+class CoopServer:
+    """Dono da simulação: um Game sem janela, um slot de jogador por cliente
+
+    O slot 0 é o `game.player`; os outros entram com Game.add_player().
+    Slot de quem saiu fica parado no mapa e é reaproveitado pelo próximo
+    cliente. Sem ninguém conectado a simulação fica pausada.
+    """
+
+    def __init__(self, game, upgrades, host="127.0.0.1", port=DEFAULT_PORT,
+                 snapshot_rate=20, max_players=4, timeout=5.0, screen_size=(800, 600)):
+        self.game = game
+        self.upgrades = upgrades
+        self.max_players = max_players
+        self.timeout = timeout
+        self.screen_size = screen_size
+        self.tick_rate = int(round(1.0 / game.fixed_dt))
+        self.snapshot_rate = snapshot_rate
+        self.snapshot_every = max(1, int(round(self.tick_rate / snapshot_rate)))
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.address = self.sock.getsockname()
+        self.clients = {}
+        self.inputs = []
+        self.tick = 0
+        self.history = OrderedDict()
+        self.tick_times = deque(maxlen=1000)
+        self.snapshot_sizes = deque(maxlen=1000)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.full_snapshots = 0
+        self.oversize = 0
+
+    def _send(self, packet, address):
+        try:
+            self.sock.sendto(packet, address)
+        except OSError:
+            return 0
+        self.bytes_sent += len(packet)
+        return len(packet)
+
+    def _join(self, address, now):
+        used = {client.slot for client in self.clients.values()}
+        free = [slot for slot in range(len(self.inputs)) if slot not in used]
+        if free:
+            slot = free[0]
+            self.inputs[slot].reset()
+        elif len(self.inputs) < self.max_players:
+            slot = len(self.inputs)
+            remote = RemoteInput()
+            if slot == 0:
+                self.game.input = remote
+            else:
+                self.game.add_player(remote)
+            self.inputs.append(remote)
+        else:
+            self._send(_BYE.pack(BYE), address)
+            return None
+        client = _Client(address, slot, now)
+        self.clients[address] = client
+        print(f"Jogador {slot + 1} entrou ({address[0]}:{address[1]})")
+        return client
+
+    def _leave(self, address, reason):
+        client = self.clients.pop(address)
+        self.inputs[client.slot].reset()
+        print(f"Jogador {client.slot + 1} saiu ({reason})")
+
+    def poll(self):
+        """Lê todos os pacotes que chegaram, sem bloquear"""
+        now = time.perf_counter()
+        while True:
+            try:
+                packet, address = self.sock.recvfrom(2048)
+            except (BlockingIOError, ConnectionError):
+                break
+            self.bytes_received += len(packet)
+            if not packet:
+                continue
+            kind = packet[0]
+            client = self.clients.get(address)
+            try:
+                if kind == HELLO:
+                    _, version = _HELLO.unpack_from(packet)
+                    if version != PROTOCOL_VERSION:
+                        self._send(_BYE.pack(BYE), address)
+                        continue
+                    if client is None:
+                        client = self._join(address, now)
+                    if client is not None:
+                        # O WELCOME pode se perder: cada HELLO repetido recebe outro
+                        self._send(_WELCOME.pack(WELCOME, client.slot, self.tick_rate,
+                                                 self.snapshot_rate, *self.screen_size), address)
+                elif client is None:
+                    continue
+                elif kind == INPUT:
+                    _, sequence, ack = _INPUT.unpack_from(packet)
+                    self.inputs[client.slot].receive(sequence, unpack_frame(packet, _INPUT.size))
+                    if ack > client.ack:
+                        client.ack = ack
+                    client.last_seen = now
+                elif kind == BYE:
+                    self._leave(address, "desconectou")
+            except struct.error:
+                continue
+
+        for address, client in list(self.clients.items()):
+            if now - client.last_seen > self.timeout:
+                self._leave(address, "sem resposta")
+
+    def step(self):
+        """Um tick da simulação (se houver alguém) e o snapshot quando for a vez"""
+        self.poll()
+        if not self.clients:
+            return False
+        game = self.game
+        start = time.perf_counter()
+        game.advance_inputs()
+        game.tick(game.fixed_dt)
+        self.tick_times.append(time.perf_counter() - start)
+        self.tick += 1
+        if self.tick % self.snapshot_every == 0:
+            self.broadcast()
+        return True
+
+    def broadcast(self):
+        state = capture(self.game, self.upgrades)
+        self.history[self.tick] = state
+        while len(self.history) > HISTORY:
+            self.history.popitem(last=False)
+
+        # Clientes que confirmaram o mesmo snapshot recebem o mesmo pacote
+        packets = {}
+        for client in self.clients.values():
+            base_tick = client.ack if client.ack in self.history else 0
+            packet = packets.get(base_tick)
+            if packet is None:
+                packet = encode_snapshot(self.tick, state, base_tick, self.history.get(base_tick))
+                packets[base_tick] = packet
+                if not base_tick:
+                    self.full_snapshots += 1
+            if len(packet) > MAX_DATAGRAM:
+                self.oversize += 1
+                continue
+            client.bytes_sent += self._send(packet, client.address)
+            self.snapshot_sizes.append(len(packet))
+
+    def stats(self, elapsed):
+        """Métricas desde o último stats(): tick, tamanho dos snapshots e banda"""
+        times = sorted(self.tick_times)
+        sizes = list(self.snapshot_sizes)
+        full = len(encode_snapshot(self.tick, self.history[next(reversed(self.history))])) if self.history else 0
+        result = {
+            "clients": len(self.clients),
+            "ticks": self.tick,
+            "tick_ms_p50": times[len(times) // 2] * 1000 if times else 0.0,
+            "tick_ms_p95": times[int(len(times) * 0.95)] * 1000 if times else 0.0,
+            "tick_ms_max": times[-1] * 1000 if times else 0.0,
+            "snapshot_bytes": statistics.mean(sizes) if sizes else 0.0,
+            "full_snapshot_bytes": full,
+            "full_snapshots": self.full_snapshots,
+            "kbps_out": self.bytes_sent * 8 / 1000 / elapsed if elapsed > 0 else 0.0,
+            "kbps_in": self.bytes_received * 8 / 1000 / elapsed if elapsed > 0 else 0.0,
+            "enemies": len(self.game.enemies),
+        }
+        self.tick_times.clear()
+        self.snapshot_sizes.clear()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.full_snapshots = 0
+        return result
+
+    def serve(self, duration=None, report_every=5.0):
+        """Roda em tempo real a `tick_rate`; acorda antes do tick se chegar pacote"""
+        dt = self.game.fixed_dt
+        start = last_report = next_tick = time.perf_counter()
+        while duration is None or time.perf_counter() - start < duration:
+            now = time.perf_counter()
+            if now < next_tick:
+                select.select([self.sock], [], [], next_tick - now)
+                self.poll()
+                continue
+            self.step()
+            next_tick += dt
+            if now - next_tick > 0.25:
+                # Atrasou demais (máquina ocupada): não tenta recuperar os ticks
+                next_tick = now
+            if report_every and now - last_report >= report_every:
+                print_stats(self.stats(now - last_report))
+                last_report = now
+
+    def close(self):
+        for address in list(self.clients):
+            self._send(_BYE.pack(BYE), address)
+        self.clients.clear()
+        self.sock.close()
+
+
+def print_stats(stats):
+    print(f"clientes={stats['clients']} tick p50={stats['tick_ms_p50']:.2f}ms "
+          f"p95={stats['tick_ms_p95']:.2f}ms máx={stats['tick_ms_max']:.2f}ms "
+          f"snapshot={stats['snapshot_bytes']:.0f}B (completo {stats['full_snapshot_bytes']}B) "
+          f"saída={stats['kbps_out']:.1f}kbps entrada={stats['kbps_in']:.1f}kbps "
+          f"inimigos={stats['enemies']}", flush=True)
+
+
+def _unscale_health(value):
+    # Vida inteira volta como int, para o HUD mostrar "100/100" como no jogo local
+    return value // 10 if value % 10 == 0 else value / 10
+
+
+class SnapshotMirror:
+    """Copia o estado recebido para os objetos de um Game que só desenha
+
+    Jogadores, inimigos e projéteis continuam sendo os mesmos Player, Enemy
+    e Projectile do jogo local, então o draw() não muda; a posição de cada
+    um é interpolada entre os dois últimos snapshots.
+    """
+
+    def __init__(self, upgrades):
+        self.upgrades = upgrades
+        self.players = {}
+        self.enemies = {}
+        self.projectiles = {}
+
+    def apply(self, game, slot, previous, current, t):
+        header = current["jogo"][0]
+        game.state = type(game.state)(header[0])
+        game.wave, game.enemies_killed, game.enemies_to_next_wave, game.total_kills = header[1:5]
+        game.available_upgrades = [self.upgrades[code - 1] for code in header[5:] if code]
+
+        def position(table, uid, values):
+            old = previous[table].get(uid) if previous else None
+            if old is None:
+                return values[0] / POSITION_SCALE, values[1] / POSITION_SCALE
+            return ((old[0] + (values[0] - old[0]) * t) / POSITION_SCALE,
+                    (old[1] + (values[1] - old[1]) * t) / POSITION_SCALE)
+
+        for player_slot, values in current["jogadores"].items():
+            if player_slot == slot:
+                player = game.player
+            else:
+                player = self.players.get(player_slot)
+                if player is None:
+                    player = self.players[player_slot] = game.add_player(None)
+            player.prev_pos = tuple(player.pos)
+            player.pos = list(position("jogadores", player_slot, values))
+            player.health = _unscale_health(values[2])
+            player.max_health = _unscale_health(values[3])
+            player.current_sprite = values[4] % len(player.sprites)
+            player.invulnerable = values[5] > 0
+            player.invulnerability_timer = values[5] / 100
+        game.camera.follow(game.player)
+
+        store = game.enemy_store
+        enemies = current["inimigos"]
+        for uid, enemy in list(self.enemies.items()):
+            if uid not in enemies:
+                # Inimigo só some do servidor quando morre
+                game.on_enemy_killed(enemy)
+                enemy.health = 0
+                del self.enemies[uid]
+        for enemy in store.compact():
+            game.enemy_pool.release(enemy)
+        store.snapshot()
+        for uid, values in enemies.items():
+            x, y = position("inimigos", uid, values)
+            enemy = self.enemies.get(uid)
+            if enemy is None:
+                enemy = game.enemy_pool.acquire(store, x, y)
+                if enemy is None:
+                    continue
+                enemy.uid = uid
+                self.enemies[uid] = enemy
+            else:
+                enemy.x = x
+                enemy.y = y
+            enemy.max_health = 255
+            enemy.health = max(1, values[2])
+
+        projectiles = current["projeteis"]
+        for uid, proj in list(self.projectiles.items()):
+            if uid not in projectiles:
+                game.projectiles.release(proj)
+                del self.projectiles[uid]
+        for uid, values in projectiles.items():
+            x, y = position("projeteis", uid, values)
+            proj = self.projectiles.get(uid)
+            if proj is None:
+                proj = game.projectiles.acquire(x, y, x + 1, y)
+                if proj is None:
+                    continue
+                proj.uid = uid
+                self.projectiles[uid] = proj
+                game.play_sound(game.shoot_sound)
+                game.on_projectile_fired(proj)
+            else:
+                proj.prev_x, proj.prev_y = proj.x, proj.y
+                proj.x, proj.y = x, y
+            proj.angle = values[2]
+
+
+class CoopClient:
+    """Cliente fino: manda a entrada, recebe e decodifica os snapshots"""
+
+    def __init__(self, address, upgrades=(), hello_interval=0.5):
+        self.server = parse_address(address) if isinstance(address, str) else address
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.connect(self.server)
+        self.sock.setblocking(False)
+        self.hello_interval = hello_interval
+        self.mirror = SnapshotMirror(list(upgrades))
+        self.slot = None
+        self.tick_rate = 60
+        self.snapshot_interval = 0.05
+        self.screen_size = (800, 600)
+        self.bases = OrderedDict()
+        self.tick = 0
+        self.state = None
+        self.previous = None
+        self.since_snapshot = 0.0
+        self.sequence = 0
+        self.clock = 0.0
+        self._next_hello = 0.0
+        self.closed = False
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.snapshots = 0
+        self.full_snapshots = 0
+        self.missing_base = 0
+
+    def _send(self, packet):
+        try:
+            self.sock.send(packet)
+        except OSError:
+            return
+        self.bytes_sent += len(packet)
+
+    def send_input(self, frame):
+        self.sequence += 1
+        self._send(_INPUT.pack(INPUT, self.sequence, self.tick) + pack_frame(frame))
+
+    def receive(self):
+        """Lê os pacotes que chegaram; devolve True se veio snapshot novo"""
+        fresh = False
+        while True:
+            try:
+                packet = self.sock.recv(MAX_DATAGRAM)
+            except (BlockingIOError, ConnectionError):
+                break
+            self.bytes_received += len(packet)
+            if not packet:
+                continue
+            kind = packet[0]
+            try:
+                if kind == WELCOME:
+                    _, self.slot, self.tick_rate, snapshot_rate, width, height = _WELCOME.unpack_from(packet)
+                    self.snapshot_interval = 1.0 / snapshot_rate
+                    self.screen_size = (width, height)
+                elif kind == SNAPSHOT and self.slot is not None:
+                    fresh |= self._snapshot(packet)
+                elif kind == BYE:
+                    print("AVISO: o servidor encerrou a conexão")
+                    self.closed = True
+            except (struct.error, zlib.error, IndexError):
+                continue
+        return fresh
+
+    def _snapshot(self, packet):
+        _, tick, base_tick, _ = _SNAPSHOT.unpack_from(packet)
+        if tick <= self.tick:
+            return False
+        try:
+            tick, base_tick, state = decode_snapshot(packet, self.bases)
+        except KeyError:
+            # A base já saiu do histórico: espera o servidor mandar outra
+            self.missing_base += 1
+            return False
+        self.bases[tick] = state
+        while len(self.bases) > HISTORY:
+            self.bases.popitem(last=False)
+        self.previous = self.state
+        self.state = state
+        self.tick = tick
+        self.since_snapshot = 0.0
+        self.snapshots += 1
+        self.full_snapshots += not base_tick
+        return True
+
+    def poll(self, dt, frame=IDLE_FRAME):
+        """Um tick do cliente: HELLO até ser aceito, entrada e snapshots"""
+        self.clock += dt
+        self.since_snapshot += dt
+        if self.slot is None:
+            if self.clock >= self._next_hello:
+                self._send(_HELLO.pack(HELLO, PROTOCOL_VERSION))
+                self._next_hello = self.clock + self.hello_interval
+        else:
+            self.send_input(frame)
+        return self.receive()
+
+    def update(self, game, dt):
+        """Tick do Game em modo cliente: manda a entrada e espelha o snapshot"""
+        self.poll(dt, capture_frame(game.input))
+        if self.state is not None:
+            t = min(1.0, self.since_snapshot / self.snapshot_interval)
+            self.mirror.apply(game, self.slot, self.previous, self.state, t)
+        game.particles.update(dt)
+
+    def close(self):
+        if self.slot is not None and not self.closed:
+            self._send(_BYE.pack(BYE))
+        self.closed = True
+        self.sock.close()
+
+
+class BotClient:
+    """Cliente sem janela que joga sozinho olhando só o snapshot
+
+    A mesma ideia do headless.BotInput: mira no inimigo mais perto, atira
+    sem parar, foge quando ele chega perto e aperta 1/R nas telas de
+    upgrade e game over.
+    """
+
+    def __init__(self, address, seed, states, kite_distance=200):
+        import random
+
+        self.client = CoopClient(address)
+        self.rng = random.Random(seed)
+        self.states = states
+        self.kite_distance = kite_distance
+        self.wander = (0, 0)
+
+    def frame(self):
+        client = self.client
+        state = client.state
+        if state is None or client.slot not in state["jogadores"]:
+            return IDLE_FRAME
+        game_state = state["jogo"][0][0]
+        if game_state == self.states["upgrade"]:
+            return (0, 0, 0, 0, False, (self.rng.choice(("1", "2", "3")),))
+        if game_state == self.states["game_over"]:
+            return (0, 0, 0, 0, False, ("r",))
+
+        me = state["jogadores"][client.slot]
+        px, py = me[0] / POSITION_SCALE, me[1] / POSITION_SCALE
+        if self.rng.random() < 0.02:
+            self.wander = (self.rng.choice((-1, 0, 1)), self.rng.choice((-1, 0, 1)))
+        target = None
+        best = math.inf
+        for x, y, _ in state["inimigos"].values():
+            dist = math.hypot(x / POSITION_SCALE - px, y / POSITION_SCALE - py)
+            if dist < best:
+                target, best = (x / POSITION_SCALE, y / POSITION_SCALE), dist
+        if target is None:
+            return (*self.wander, 0, 0, False, ())
+
+        width, height = client.screen_size
+        mouse = (target[0] - px + width // 2, target[1] - py + height // 2)
+        move = self.wander
+        if best <= self.kite_distance:
+            away_x, away_y = px - target[0], py - target[1]
+            move = (int(away_x > 0) - int(away_x < 0), int(away_y > 0) - int(away_y < 0))
+        return (*move, int(mouse[0]), int(mouse[1]), True, ())
+
+
+def run_bots(address, count, seconds, seed=0, tick_rate=60):
+    import headless
+
+    mod = headless.load_game_module()
+    states = {"upgrade": mod.GameState.UPGRADE_SELECTION.value,
+              "game_over": mod.GameState.GAME_OVER.value}
+    bots = [BotClient(address, seed + i, states) for i in range(count)]
+    dt = 1.0 / tick_rate
+    start = next_tick = time.perf_counter()
+    decode_time = 0.0
+    while time.perf_counter() - start < seconds:
+        now = time.perf_counter()
+        if now < next_tick:
+            time.sleep(next_tick - now)
+            continue
+        next_tick += dt
+        for bot in bots:
+            decode_start = time.perf_counter()
+            bot.client.poll(dt, bot.frame())
+            decode_time += time.perf_counter() - decode_start
+    elapsed = time.perf_counter() - start
+
+    for i, bot in enumerate(bots):
+        client = bot.client
+        print(f"bot {i + 1}: slot={client.slot} snapshots={client.snapshots} "
+              f"(completos {client.full_snapshots}, sem base {client.missing_base}) "
+              f"entrada={client.bytes_received * 8 / 1000 / elapsed:.1f}kbps "
+              f"saída={client.bytes_sent * 8 / 1000 / elapsed:.1f}kbps")
+        client.close()
+    print(f"tempo de rede+decodificação por bot e tick: "
+          f"{decode_time / max(1, len(bots)) / (elapsed * tick_rate) * 1000:.3f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Co-op local do Kodland Survival")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    server = sub.add_parser("server", help="roda o servidor sem janela")
+    server.add_argument("--host", default="127.0.0.1")
+    server.add_argument("--port", type=int, default=DEFAULT_PORT)
+    server.add_argument("--tick-rate", type=int, default=60, help="ticks de simulação por segundo")
+    server.add_argument("--snapshot-rate", type=int, default=20, help="snapshots por segundo")
+    server.add_argument("--players", type=int, default=4, help="máximo de jogadores")
+    server.add_argument("--seed", type=int, default=None)
+    server.add_argument("--seconds", type=float, default=None, help="encerra depois deste tempo")
+    server.add_argument("--report", type=float, default=5.0, help="intervalo das métricas (s)")
+
+    bots = sub.add_parser("bots", help="conecta clientes bot sem janela")
+    bots.add_argument("--address", default=f"127.0.0.1:{DEFAULT_PORT}")
+    bots.add_argument("--clients", type=int, default=2)
+    bots.add_argument("--seconds", type=float, default=30.0)
+    bots.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "bots":
+        run_bots(args.address, args.clients, args.seconds, args.seed)
+        return 0
+
+    import headless
+
+    mod = headless.load_game_module()
+    game = headless.new_game(args.seed)
+    game.fixed_dt = 1.0 / args.tick_rate
+    coop = CoopServer(game, list(mod.UpgradeType), args.host, args.port, args.snapshot_rate,
+                      args.players, screen_size=(mod.WIDTH, mod.HEIGHT))
+    print(f"Servidor em {coop.address[0]}:{coop.address[1]} "
+          f"({coop.tick_rate} ticks/s, {args.snapshot_rate} snapshots/s)")
+    try:
+        coop.serve(args.seconds, args.report)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        coop.close()
+        game.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
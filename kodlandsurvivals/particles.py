@@ -0,0 +1,172 @@
+import math
+import time
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ParticleSystem:
+    """Partículas num buffer circular de arrays NumPy com orçamento fixo
+
+    Cada partícula tem posição, velocidade, idade/vida, cor (índice na
+    paleta, um dict nome -> RGB) e tamanho. Quando o buffer enche, as mais
+    antigas são sobrescritas. `max_emit` limita quantas nascem por tick e `max_draw`
+    quantas são desenhadas por frame; com `time_budget` (segundos por frame)
+    os dois limites encolhem sozinhos se os efeitos passarem do orçamento.
+    As partículas usam um gerador próprio, então não mexem no `random` do jogo.
+    """
+
+    FADE_LEVELS = 4
+    MAX_SIZE = 3
+
+    def __init__(self, palette, capacity=2048, max_emit=256, max_draw=1500,
+                 time_budget=None, drag=3.0, seed=None):
+        self.enabled = np is not None
+        self.palette = dict(palette)
+        self.colors = {name: index for index, name in enumerate(self.palette)}
+        self.capacity = capacity
+        self.max_emit = max_emit
+        self.max_draw = max_draw
+        self.time_budget = time_budget
+        self.drag = drag
+        self.quality = 1.0
+        self.emitted = 0
+        self.dropped = 0
+        self.drawn = 0
+        self._emitted_this_tick = 0
+        self._frame_time = 0.0
+        if not self.enabled:
+            print("AVISO: numpy não encontrado - partículas desligadas")
+            return
+
+        self.rng = np.random.default_rng(seed)
+        self.head = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.age = np.zeros(capacity)
+        self.life = np.zeros(capacity)
+        self.color = np.zeros(capacity, dtype=np.intp)
+        self.size = np.ones(capacity, dtype=np.intp)
+        self._sprites = self._build_sprites()
+
+    def _build_sprites(self):
+        # Índice = (cor * MAX_SIZE + tamanho - 1) * FADE_LEVELS + nível de fade
+        sprites = []
+        for rgb in self.palette.values():
+            for size in range(1, self.MAX_SIZE + 1):
+                for fade in range(self.FADE_LEVELS):
+                    surf = pygame.Surface((size, size), pygame.SRCALPHA)
+                    alpha = int(255 * (1.0 - fade / self.FADE_LEVELS))
+                    surf.fill((*rgb, alpha))
+                    sprites.append(surf)
+        return sprites
+
+    def emit(self, x, y, count, color, speed=(40, 120), life=(0.2, 0.5),
+             direction=None, spread=2 * math.pi, size=2):
+        """Solta `count` partículas de (x, y); devolve quantas nasceram"""
+        if not self.enabled:
+            return 0
+        wanted = int(count * self.quality + 0.5)
+        count = max(0, min(wanted, self.max_emit - self._emitted_this_tick))
+        self.dropped += wanted - count
+        if count == 0:
+            return 0
+
+        slots = (self.head + np.arange(count)) % self.capacity
+        self.head = (self.head + count) % self.capacity
+        self._emitted_this_tick += count
+        self.emitted += count
+
+        rng = self.rng
+        base = rng.uniform(0, 2 * math.pi) if direction is None else direction
+        angles = base + rng.uniform(-spread / 2, spread / 2, count)
+        speeds = rng.uniform(speed[0], speed[1], count)
+        self.x[slots] = x
+        self.y[slots] = y
+        self.vx[slots] = np.cos(angles) * speeds
+        self.vy[slots] = np.sin(angles) * speeds
+        self.age[slots] = 0.0
+        self.life[slots] = rng.uniform(life[0], life[1], count)
+        self.color[slots] = self.colors[color]
+        self.size[slots] = max(1, min(self.MAX_SIZE, size))
+        return count
+
+    def update(self, dt):
+        if not self.enabled:
+            return
+        start = time.perf_counter()
+        self._emitted_this_tick = 0
+        alive = self.age < self.life
+        if alive.any():
+            damping = max(0.0, 1.0 - self.drag * dt)
+            self.age[alive] += dt
+            self.vx[alive] *= damping
+            self.vy[alive] *= damping
+            self.x[alive] += self.vx[alive] * dt
+            self.y[alive] += self.vy[alive] * dt
+        self._frame_time += time.perf_counter() - start
+
+    def draw(self, surface, offset_x, offset_y):
+        """Desenha as partículas visíveis num único blits(); devolve o Rect tocado"""
+        if not self.enabled:
+            return None
+        start = time.perf_counter()
+        width, height = surface.get_size()
+        sx = (self.x - offset_x).astype(np.intp)
+        sy = (self.y - offset_y).astype(np.intp)
+        visible = np.flatnonzero((self.age < self.life) &
+                                 (sx > -self.MAX_SIZE) & (sx < width) &
+                                 (sy > -self.MAX_SIZE) & (sy < height))
+        limit = int(self.max_draw * self.quality)
+        if len(visible) > limit:
+            visible = visible[-limit:]
+        self.drawn = len(visible)
+
+        rect = None
+        if self.drawn:
+            sx = sx[visible]
+            sy = sy[visible]
+            fade = np.minimum(self.age[visible] / self.life[visible] * self.FADE_LEVELS,
+                              self.FADE_LEVELS - 1).astype(np.intp)
+            keys = ((self.color[visible] * self.MAX_SIZE + self.size[visible] - 1)
+                    * self.FADE_LEVELS + fade)
+            sprites = self._sprites
+            surface.blits(
+                [(sprites[k], (px, py)) for k, px, py in zip(keys.tolist(), sx.tolist(), sy.tolist())],
+                doreturn=False,
+            )
+            left, top = int(sx.min()), int(sy.min())
+            rect = pygame.Rect(left, top, int(sx.max()) - left + self.MAX_SIZE,
+                               int(sy.max()) - top + self.MAX_SIZE)
+
+        self._frame_time += time.perf_counter() - start
+        self._adapt()
+        return rect
+
+    def _adapt(self):
+        # Passou do orçamento: corta rápido; sobrou folga: volta devagar
+        frame_time, self._frame_time = self._frame_time, 0.0
+        if self.time_budget is None:
+            return
+        if frame_time > self.time_budget:
+            self.quality = max(0.1, self.quality * 0.8)
+        elif frame_time < self.time_budget * 0.5:
+            self.quality = min(1.0, self.quality + 0.02)
+
+    @property
+    def alive(self):
+        if not self.enabled:
+            return 0
+        return int(np.count_nonzero(self.age < self.life))
+
+    def clear(self):
+        if self.enabled:
+            self.age[:] = 0.0
+            self.life[:] = 0.0
+        self.quality = 1.0
@@ -0,0 +1,72 @@
+class Pool:
+    """Pool de capacidade fixa com lista livre e remoção por troca (O(1))
+
+    Os objetos precisam ter `reset(*args)` e um atributo `pool_index`. Ao
+    liberar, o último objeto ativo ocupa o lugar do removido, então a ordem de
+    `active` não é preservada.
+    """
+
+    def __init__(self, factory, capacity):
+        self.factory = factory
+        self.capacity = capacity
+        self.active = []
+        self.free = []
+        self.created = 0
+
+    def __len__(self):
+        return len(self.active)
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def __bool__(self):
+        return bool(self.active)
+
+    def prefill(self):
+        """Cria os `capacity` objetos de uma vez, antes de começar a usar o pool"""
+        while self.created < self.capacity:
+            obj = self.factory()
+            obj.pool_index = -1
+            self.free.append(obj)
+            self.created += 1
+
+    def acquire(self, *args):
+        """Reaproveita um objeto livre; devolve None se o pool estiver cheio"""
+        if self.free:
+            obj = self.free.pop()
+        elif self.created < self.capacity:
+            obj = self.factory()
+            self.created += 1
+        else:
+            return None
+
+        obj.reset(*args)
+        obj.pool_index = len(self.active)
+        self.active.append(obj)
+        return obj
+
+    def release(self, obj):
+        index = obj.pool_index
+        if index < 0:
+            return False
+        last = self.active.pop()
+        if last is not obj:
+            self.active[index] = last
+            last.pool_index = index
+        obj.pool_index = -1
+        self.free.append(obj)
+        return True
+
+    def release_where(self, predicate):
+        """Libera os objetos para os quais predicate(obj) é verdadeiro"""
+        active = self.active
+        for i in range(len(active) - 1, -1, -1):
+            obj = active[i]
+            if predicate(obj):
+                self.release(obj)
+
+    def clear(self):
+        for obj in self.active:
+            obj.pool_index = -1
+            self.free.append(obj)
+        self.active = []
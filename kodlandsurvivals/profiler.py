@@ -0,0 +1,190 @@
+import csv
+import gc
+import json
+import sys
+import time
+from collections import deque
+
+import pygame
+
+
+class _NullSection:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class _Section:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    """Tempo por subsistema em cada frame, com percentis numa janela móvel
+
+    Uso: `with profiler.section("colisoes"): ...` entre begin_frame() e
+    end_frame(). Tempos de seções com o mesmo nome no mesmo frame se somam.
+    """
+
+    def __init__(self, window=300, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self.frames = deque(maxlen=window)
+        self.sections = []
+        self.frame_index = 0
+        self._current = {}
+        self._frame_start = None
+        self._blocks_start = 0
+        self._gc_start = 0
+
+    def section(self, name):
+        if not self.enabled:
+            return _NULL_SECTION
+        return _Section(self, name)
+
+    def add(self, name, seconds):
+        if name not in self._current:
+            self._current[name] = 0.0
+            if name not in self.sections:
+                self.sections.append(name)
+        self._current[name] += seconds
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._current = {}
+        self._frame_start = time.perf_counter()
+        self._blocks_start = sys.getallocatedblocks()
+        self._gc_start = sum(stat["collections"] for stat in gc.get_stats())
+
+    def end_frame(self, **counts):
+        """Fecha o frame; `counts` guarda contagens extras (ex.: inimigos=20)"""
+        if not self.enabled or self._frame_start is None:
+            return
+        record = {
+            "frame": self.frame_index,
+            "total": time.perf_counter() - self._frame_start,
+            "sections": self._current,
+            "blocks": sys.getallocatedblocks() - self._blocks_start,
+            "gc": sum(stat["collections"] for stat in gc.get_stats()) - self._gc_start,
+            "counts": counts,
+        }
+        self.frames.append(record)
+        self.frame_index += 1
+        self._current = {}
+        self._frame_start = None
+
+    def reset(self):
+        self.frames.clear()
+        self.sections = []
+        self._current = {}
+        self._frame_start = None
+
+    def summary(self):
+        """{seção: {"p50": ms, "p95": ms, "p99": ms}} sobre a janela atual"""
+        result = {}
+        for name in ["total"] + self.sections:
+            if name == "total":
+                values = [frame["total"] for frame in self.frames]
+            else:
+                values = [frame["sections"].get(name, 0.0) for frame in self.frames]
+            values.sort()
+            result[name] = {
+                "p50": percentile(values, 0.50) * 1000,
+                "p95": percentile(values, 0.95) * 1000,
+                "p99": percentile(values, 0.99) * 1000,
+            }
+        return result
+
+    def rows(self):
+        count_names = []
+        for frame in self.frames:
+            for name in frame["counts"]:
+                if name not in count_names:
+                    count_names.append(name)
+
+        header = ["frame", "total_ms"] + [f"{name}_ms" for name in self.sections]
+        header += ["blocks", "gc"] + count_names
+        rows = [header]
+        for frame in self.frames:
+            row = [frame["frame"], round(frame["total"] * 1000, 4)]
+            row += [round(frame["sections"].get(name, 0.0) * 1000, 4) for name in self.sections]
+            row += [frame["blocks"], frame["gc"]]
+            row += [frame["counts"].get(name, 0) for name in count_names]
+            rows.append(row)
+        return rows
+
+    def export_csv(self, path):
+        with open(path, "w", newline="") as f:
+            csv.writer(f).writerows(self.rows())
+
+    def export_json(self, path):
+        data = {
+            "summary": self.summary(),
+            "frames": [
+                {
+                    "frame": frame["frame"],
+                    "total_ms": frame["total"] * 1000,
+                    "sections_ms": {name: value * 1000 for name, value in frame["sections"].items()},
+                    "blocks": frame["blocks"],
+                    "gc": frame["gc"],
+                    "counts": frame["counts"],
+                }
+                for frame in self.frames
+            ],
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    def overlay_lines(self):
+        lines = ["secao        p50    p95    p99 (ms)"]
+        for name, stats in self.summary().items():
+            lines.append(f"{name[:10]:<10} {stats['p50']:6.2f} {stats['p95']:6.2f} {stats['p99']:6.2f}")
+        if self.frames:
+            last = self.frames[-1]
+            counts = [f"{name}={value}" for name, value in last["counts"].items()]
+            counts += [f"blocos={last['blocks']}", f"gc={last['gc']}"]
+            line = ""
+            for item in counts:
+                if line and len(line) + len(item) >= 38:
+                    lines.append(line)
+                    line = ""
+                line = f"{line} {item}" if line else item
+            lines.append(line)
+        return lines
+
+    def draw_overlay(self, screen, topleft=(10, 130)):
+        lines = self.overlay_lines()
+        width, height = 330, 16 * len(lines) + 10
+        rect = pygame.Rect(topleft, (width, height))
+        screen.draw.filled_rect(rect, (0, 0, 0))
+        screen.draw.text(
+            "\n".join(lines),
+            topleft=(topleft[0] + 5, topleft[1] + 5),
+            fontsize=18,
+            color="white",
+        )
+        return rect
@@ -0,0 +1,61 @@
+import pygame
+
+
+class HealthBars:
+    """Barras de vida pré-desenhadas: uma superfície por largura do verde"""
+
+    def __init__(self, width, height, back=(255, 0, 0), front=(0, 255, 0)):
+        self.width = width
+        self.height = height
+        self.surfaces = []
+        for filled in range(width + 1):
+            surf = pygame.Surface((width, height))
+            surf.fill(back)
+            if filled:
+                surf.fill(front, pygame.Rect(0, 0, filled, height))
+            self.surfaces.append(surf)
+
+    def get(self, fraction):
+        filled = int(self.width * fraction)
+        return self.surfaces[max(0, min(self.width, filled))]
+
+
+class SpriteBatch:
+    """Junta os blits do frame por camada e manda tudo num Surface.blits
+
+    Sprites fora da área visível são descartados já no add().
+    """
+
+    def __init__(self, layers, view):
+        self.layers = {name: [] for name in layers}
+        self.order = list(layers)
+        self.view = pygame.Rect(view)
+        self.submitted = 0
+        self.culled = 0
+
+    def clear(self):
+        for jobs in self.layers.values():
+            jobs.clear()
+        self.submitted = 0
+        self.culled = 0
+
+    def add(self, layer, surf, pos):
+        width, height = surf.get_size()
+        view = self.view
+        if (pos[0] + width < view.left or pos[0] > view.right or
+                pos[1] + height < view.top or pos[1] > view.bottom):
+            self.culled += 1
+            return False
+        self.layers[layer].append((surf, pos))
+        self.submitted += 1
+        return True
+
+    def flush(self, surface):
+        """Desenha todas as camadas em ordem e devolve os retângulos tocados"""
+        rects = []
+        for name in self.order:
+            jobs = self.layers[name]
+            if jobs:
+                rects.extend(surface.blits(jobs))
+                jobs.clear()
+        return rects
@@ -0,0 +1,255 @@
+"""Gravação e replay determinísticos de partidas
+
+    python replay.py replay_20240101_120000.ksr        # confere o hash de cada tick
+    python replay.py partida.ksr --no-verify --repeat 5  # só mede ticks/s
+
+No jogo, F5 começa uma partida gravada e F6 para e salva o arquivo. O
+arquivo guarda o estado do `random` no começo da gravação e a entrada de
+cada tick (movimento, mouse, clique e teclas), comprimidos com zlib.
+"""
+import argparse
+import random
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+MAGIC = b"KSRP"
+VERSION = 1
+FLAG_HASHES = 1
+KEY_ORDER = ("escape", "r", "1", "2", "3")
+
+_HEADER = struct.Struct("<4sHHBI")     # magic, versão, ticks/s, flags, ticks
+_RNG = struct.Struct("<i625I?d")       # random.getstate() do Mersenne Twister
+FRAME = struct.Struct("<bbhhB")        # move_x, move_y, mouse_x, mouse_y, clique+teclas
+_HASH = struct.Struct("<I")
+
+
+def _clamp16(value):
+    return max(-32768, min(32767, int(round(value))))
+
+
+def capture_frame(source):
+    """Lê uma fonte de entrada já no formato do arquivo (o que o tick deve ver)"""
+    move_x, move_y = source.movement()
+    mouse_x, mouse_y = source.mouse_pos()
+    return (
+        max(-1, min(1, int(move_x))),
+        max(-1, min(1, int(move_y))),
+        _clamp16(mouse_x),
+        _clamp16(mouse_y),
+        bool(source.mouse_pressed()),
+        tuple(key for key in KEY_ORDER if source.pressed(key)),
+    )
+
+
+def pack_frame(frame):
+    move_x, move_y, mouse_x, mouse_y, click, keys = frame
+    buttons = int(bool(click))
+    for bit, key in enumerate(KEY_ORDER, 1):
+        if key in keys:
+            buttons |= 1 << bit
+    return FRAME.pack(move_x, move_y, mouse_x, mouse_y, buttons)
+
+
+def unpack_frame(data, offset=0):
+    move_x, move_y, mouse_x, mouse_y, buttons = FRAME.unpack_from(data, offset)
+    keys = tuple(key for bit, key in enumerate(KEY_ORDER, 1) if buttons & (1 << bit))
+    return move_x, move_y, mouse_x, mouse_y, bool(buttons & 1), keys
+
+
+class ReplayLog:
+    """Estado inicial do random + um quadro de entrada (e hash opcional) por tick"""
+
+    def __init__(self, tick_rate, rng_state, frames=None, hashes=None):
+        self.tick_rate = tick_rate
+        self.rng_state = rng_state
+        self.frames = frames if frames is not None else []
+        self.hashes = hashes
+
+    def __len__(self):
+        return len(self.frames)
+
+    def to_bytes(self):
+        version, internal, gauss = self.rng_state
+        flags = FLAG_HASHES if self.hashes is not None else 0
+        body = bytearray()
+        for tick, frame in enumerate(self.frames):
+            body += pack_frame(frame)
+            if flags & FLAG_HASHES:
+                body += _HASH.pack(self.hashes[tick])
+
+        header = _HEADER.pack(MAGIC, VERSION, self.tick_rate, flags, len(self.frames))
+        rng = _RNG.pack(version, *internal, gauss is not None, gauss or 0.0)
+        return header + zlib.compress(rng + bytes(body), 9)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, tick_rate, flags, count = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("arquivo não é um replay do Kodland Survival")
+        if version != VERSION:
+            raise ValueError(f"versão de replay não suportada: {version}")
+
+        payload = zlib.decompress(data[_HEADER.size:])
+        values = _RNG.unpack_from(payload)
+        rng_state = (values[0], tuple(values[1:626]), values[627] if values[626] else None)
+
+        frames = []
+        hashes = [] if flags & FLAG_HASHES else None
+        offset = _RNG.size
+        for _ in range(count):
+            frames.append(unpack_frame(payload, offset))
+            offset += FRAME.size
+            if hashes is not None:
+                hashes.append(_HASH.unpack_from(payload, offset)[0])
+                offset += _HASH.size
+        return cls(tick_rate, rng_state, frames, hashes)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def state_hash(game):
+    """CRC32 do que importa na simulação: jogador, wave, placar e inimigos"""
+    player = game.player
+    xs, ys = game.enemy_store.positions()
+    data = struct.pack(
+        "<dddiiii",
+        player.pos[0], player.pos[1], player.health,
+        game.state.value, game.wave, game.total_kills, len(game.projectiles),
+    )
+    data += array("d", xs).tobytes() + array("d", ys).tobytes()
+    return zlib.crc32(data)
+
+
+class RecordingInput:
+    """Repassa a entrada de outra fonte e anota o que o tick viu
+
+    O jogo recebe os valores já arredondados para o formato do arquivo,
+    então o replay vê exatamente a mesma coisa.
+    """
+
+    def __init__(self, source, log):
+        self.source = source
+        self.log = log
+        self.current = (0, 0, 0, 0, False, ())
+
+    def advance(self):
+        source = self.source
+        if hasattr(source, "advance"):
+            source.advance()
+        self.current = capture_frame(source)
+        self.log.frames.append(self.current)
+
+    def movement(self):
+        return self.current[0], self.current[1]
+
+    def mouse_pos(self):
+        return self.current[2], self.current[3]
+
+    def mouse_pressed(self):
+        return self.current[4]
+
+    def pressed(self, key):
+        return key in self.current[5]
+
+
+class ReplayRecorder:
+    """Grava a partida a partir do estado atual do `random` e do Game"""
+
+    def __init__(self, game, hashes=True):
+        self.game = game
+        self.source = game.input
+        self.log = ReplayLog(int(round(1.0 / game.fixed_dt)), random.getstate(),
+                             hashes=[] if hashes else None)
+        game.input = RecordingInput(self.source, self.log)
+
+    def record_tick(self, game):
+        if self.log.hashes is not None:
+            self.log.hashes.append(state_hash(game))
+
+    def stop(self, path=None):
+        self.game.input = self.source
+        if path is not None:
+            self.log.save(path)
+        return self.log
+
+
+class ReplayMismatch(Exception):
+    def __init__(self, tick, expected, actual):
+        super().__init__(f"replay divergiu no tick {tick}: hash {actual:08x}, esperado {expected:08x}")
+        self.tick = tick
+        self.expected = expected
+        self.actual = actual
+
+
+def replay(log, verify=True, on_tick=None):
+    """Roda o replay sem janela, o mais rápido possível; devolve as estatísticas
+
+    Com `verify`, levanta ReplayMismatch no primeiro tick cujo hash não bate.
+    """
+    import headless
+
+    controls = headless.ScriptedInput(log.frames)
+    game = headless.new_game(controls=controls)
+    random.setstate(log.rng_state)
+    dt = 1.0 / log.tick_rate
+    verify = verify and log.hashes is not None
+
+    start = time.perf_counter()
+    try:
+        for tick in range(len(log.frames)):
+            controls.advance()
+            game.tick(dt)
+            if verify:
+                actual = state_hash(game)
+                if actual != log.hashes[tick]:
+                    raise ReplayMismatch(tick, log.hashes[tick], actual)
+            if on_tick is not None:
+                on_tick(game, tick)
+    finally:
+        game.shutdown()
+    elapsed = time.perf_counter() - start
+
+    ticks = len(log.frames)
+    return {
+        "ticks": ticks,
+        "wall_time": elapsed,
+        "ticks_per_second": ticks / elapsed if elapsed > 0 else 0.0,
+        "wave": game.wave,
+        "kills": game.total_kills,
+        "state_hash": state_hash(game),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Roda um replay gravado sem janela")
+    parser.add_argument("path", help="arquivo .ksr")
+    parser.add_argument("--no-verify", action="store_true", help="não confere os hashes por tick")
+    parser.add_argument("--repeat", type=int, default=1, help="quantas vezes rodar")
+    args = parser.parse_args(argv)
+
+    log = ReplayLog.load(args.path)
+    print(f"{args.path}: {len(log)} ticks a {log.tick_rate} ticks/s"
+          f"{'' if log.hashes is not None else ' (sem hashes)'}")
+    for _ in range(args.repeat):
+        try:
+            stats = replay(log, verify=not args.no_verify)
+        except ReplayMismatch as e:
+            print(f"ERRO: {e}")
+            return 1
+        print(f"wave={stats['wave']} kills={stats['kills']} hash={stats['state_hash']:08x} "
+              f"{stats['ticks_per_second']:.0f} ticks/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+class SpatialHash:
+    """Grade uniforme para a fase ampla das colisões
+
+    Cada objeto é inserido em todas as células que o seu retângulo toca; uma
+    consulta só devolve os objetos das células vizinhas, então o custo depende
+    de quantos pares estão perto e não do total de entidades.
+    """
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def _cell_range(self, x, y, half_w, half_h):
+        size = self.cell_size
+        return (int((x - half_w) // size), int((x + half_w) // size),
+                int((y - half_h) // size), int((y + half_h) // size))
+
+    def insert(self, obj, x, y, half_w, half_h):
+        x0, x1, y0, y1 = self._cell_range(x, y, half_w, half_h)
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = [obj]
+                else:
+                    bucket.append(obj)
+
+    def query(self, x, y, half_w, half_h):
+        x0, x1, y0, y1 = self._cell_range(x, y, half_w, half_h)
+        cells = self.cells
+        if x0 == x1 and y0 == y1:
+            return list(cells.get((x0, y0), ()))
+
+        found = []
+        seen = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for obj in cells.get((cx, cy), ()):
+                    if id(obj) not in seen:
+                        seen.add(id(obj))
+                        found.append(obj)
+        return found
+
+    def query_entity(self, entity):
+        return self.query(entity.x, entity.y, entity.width / 2, entity.height / 2)
+
+
+def bounding_radius(width, height):
+    return (width * width + height * height) ** 0.5 / 2
+
+
+def circles_overlap(a, b):
+    """Pré-teste barato antes da máscara de pixels"""
+    dx = a.x - b.x
+    dy = a.y - b.y
+    reach = a.radius + b.radius
+    return dx * dx + dy * dy <= reach * reach
@@ -0,0 +1,121 @@
+import heapq
+import math
+import random
+import time
+
+
+# Cada padrão devolve [(dx, dy, atraso)] relativos ao jogador. A posição
+# final só é calculada quando o spawn sai da fila, então quem nasce depois
+# (trickle) continua aparecendo em volta de onde o jogador está.
+
+def scatter_pattern(count, distance, rng=random):
+    """Ângulos e distâncias aleatórios, todos de uma vez (o spawn original)"""
+    spawns = []
+    for _ in range(count):
+        angle = rng.uniform(0, 2 * math.pi)
+        radius = rng.uniform(distance, distance + 100)
+        spawns.append((math.cos(angle) * radius, math.sin(angle) * radius, 0.0))
+    return spawns
+
+
+def ring_pattern(count, distance, rng=random):
+    """Círculo fechado em volta do jogador, espaçamento igual"""
+    start = rng.uniform(0, 2 * math.pi)
+    step = 2 * math.pi / max(1, count)
+    return [
+        (math.cos(start + i * step) * distance, math.sin(start + i * step) * distance, 0.0)
+        for i in range(count)
+    ]
+
+
+def burst_pattern(count, distance, rng=random, spread=0.35, wave_size=4, interval=0.5):
+    """Grupos apertados vindos de uma mesma direção, um grupo a cada `interval`"""
+    spawns = []
+    angle = rng.uniform(0, 2 * math.pi)
+    for i in range(count):
+        group = i // wave_size
+        if i % wave_size == 0 and i:
+            angle = rng.uniform(0, 2 * math.pi)
+        a = angle + rng.uniform(-spread, spread)
+        radius = rng.uniform(distance, distance + 60)
+        spawns.append((math.cos(a) * radius, math.sin(a) * radius, group * interval))
+    return spawns
+
+
+def trickle_pattern(count, distance, rng=random, interval=0.4):
+    """Um inimigo por vez, a cada `interval` segundos"""
+    return [(dx, dy, i * interval) for i, (dx, dy, _) in enumerate(scatter_pattern(count, distance, rng))]
+
+
+PATTERNS = {
+    "scatter": scatter_pattern,
+    "ring": ring_pattern,
+    "burst": burst_pattern,
+    "trickle": trickle_pattern,
+}
+
+
+class SpawnScheduler:
+    """Fila de spawns liberada aos poucos, com limite por frame
+
+    No máximo `max_per_frame` spawns saem a cada update(); com `time_budget`
+    (segundos de relógio) a liberação também para quando o orçamento acaba.
+    O orçamento por tempo depende da máquina, então deixa de ser
+    determinístico: fica desligado (None) por padrão.
+    """
+
+    def __init__(self, max_per_frame=3, time_budget=None, rng=random):
+        self.max_per_frame = max_per_frame
+        self.time_budget = time_budget
+        self.rng = rng
+        self.time = 0.0
+        self._queue = []
+        self._sequence = 0
+        self.released = 0
+        self.deferred_frames = 0
+
+    def schedule(self, pattern, count, distance, *args):
+        """Enfileira `count` spawns no padrão dado; `args` vão para o callback"""
+        for dx, dy, delay in PATTERNS[pattern](count, distance, self.rng):
+            heapq.heappush(self._queue, (self.time + delay, self._sequence, dx, dy, args))
+            self._sequence += 1
+
+    def update(self, dt, spawn):
+        """Avança o relógio e chama spawn(dx, dy, *args) dentro do orçamento"""
+        self.time += dt
+        queue = self._queue
+        released = 0
+        start = time.perf_counter()
+        while queue and queue[0][0] <= self.time:
+            if released >= self.max_per_frame:
+                self.deferred_frames += 1
+                break
+            if (self.time_budget is not None and released and
+                    time.perf_counter() - start >= self.time_budget):
+                self.deferred_frames += 1
+                break
+            _, _, dx, dy, args = heapq.heappop(queue)
+            spawn(dx, dy, *args)
+            released += 1
+        self.released += released
+        return released
+
+    def flush(self, spawn):
+        """Libera tudo o que está na fila, ignorando atrasos e orçamento"""
+        count = len(self._queue)
+        while self._queue:
+            _, _, dx, dy, args = heapq.heappop(self._queue)
+            spawn(dx, dy, *args)
+        self.released += count
+        return count
+
+    def clear(self):
+        # O relógio volta a zero: com ele alto, o arredondamento decide em qual
+        # tick sai um spawn atrasado e um replay gravado depois não se repete
+        self._queue.clear()
+        self.time = 0.0
+        self._sequence = 0
+
+    @property
+    def pending(self):
+        return len(self._queue)
@@ -0,0 +1,66 @@
+from collections import OrderedDict
+
+from pgzero import ptext
+
+
+class TextCache:
+    """Cache de textos já rasterizados e posicionados, com descarte LRU
+
+    A chave é (texto, estilo/posição), com os mesmos argumentos de
+    screen.draw.text. Devolve (superfície, posição) prontos para o blit.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text, **style):
+        key = (text, tuple(sorted(style.items())))
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        entry = ptext.draw(text, surf=None, **style)
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def draw(self, screen, text, **style):
+        surf, pos = self.get(text, **style)
+        screen.blit(surf, pos)
+        return surf.get_rect(topleft=pos)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def line_height(fontsize=None, lineheight=None):
+    fontsize = ptext.DEFAULT_FONT_SIZE if fontsize is None else fontsize
+    lineheight = ptext.DEFAULT_LINE_HEIGHT if lineheight is None else lineheight
+    return int(round(ptext.getfont(None, fontsize).get_linesize() * lineheight))
+
+
+class HudField:
+    """Uma linha do HUD que só volta a rasterizar quando o valor muda"""
+
+    def __init__(self, cache, template, **style):
+        self.cache = cache
+        self.template = template
+        self.style = style
+        self.value = None
+        self.entry = None
+
+    def draw(self, screen, *value):
+        if self.entry is None or value != self.value:
+            self.value = value
+            self.entry = self.cache.get(self.template.format(*value), **self.style)
+        screen.blit(*self.entry)
@@ -0,0 +1,84 @@
+import pygame
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class WalkabilityGrid:
+    """Mapa de colisão pré-processado: um byte por pixel, 1 = dá para andar
+
+    Substitui o Surface.get_at por consultas em bytes puros (sem travar a
+    superfície). Fora do mapa nada é andável.
+    """
+
+    def __init__(self, width, height, data):
+        self.width = width
+        self.height = height
+        self.data = bytes(data)
+
+    @classmethod
+    def from_surface(cls, surface, walkable_color=(0, 0, 0)):
+        width, height = surface.get_size()
+        rgb = pygame.image.tobytes(surface, "RGB")
+        if np is not None:
+            pixels = np.frombuffer(rgb, dtype=np.uint8).reshape(height, width, 3)
+            walkable = (pixels == np.array(walkable_color[:3], dtype=np.uint8)).all(axis=2)
+            data = walkable.astype(np.uint8).tobytes()
+        else:
+            color = bytes(walkable_color[:3])
+            data = bytearray(width * height)
+            for i in range(width * height):
+                if rgb[i * 3:i * 3 + 3] == color:
+                    data[i] = 1
+        return cls(width, height, data)
+
+    @classmethod
+    def load(cls, path, walkable_color=(0, 0, 0)):
+        return cls.from_surface(pygame.image.load(path), walkable_color)
+
+    def get_width(self):
+        return self.width
+
+    def get_height(self):
+        return self.height
+
+    def as_array(self):
+        """Cópia somente-leitura como array NumPy (altura x largura) de bool"""
+        return np.frombuffer(self.data, dtype=np.uint8).reshape(self.height, self.width).astype(bool)
+
+    def is_walkable(self, x, y):
+        x, y = int(x), int(y)
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.data[y * self.width + x] == 1
+        return False
+
+    def rect_walkable(self, x, y, width, height):
+        """True se todo o retângulo (canto superior esquerdo em x, y) é andável"""
+        x0, y0 = int(x), int(y)
+        x1, y1 = int(x + width), int(y + height)
+        if x0 < 0 or y0 < 0 or x1 >= self.width or y1 >= self.height:
+            return False
+        data, stride = self.data, self.width
+        for row in range(y0, y1 + 1):
+            start = row * stride
+            if 0 in data[start + x0:start + x1 + 1]:
+                return False
+        return True
+
+    def first_blocked(self, x0, y0, x1, y1):
+        """Fração (0..1) do segmento onde a primeira parede aparece, ou None"""
+        dx = x1 - x0
+        dy = y1 - y0
+        steps = int(max(abs(dx), abs(dy)))
+        if steps == 0:
+            return None if self.is_walkable(x0, y0) else 0.0
+        for i in range(steps + 1):
+            t = i / steps
+            if not self.is_walkable(x0 + dx * t, y0 + dy * t):
+                return t
+        return None
+
+    def segment_walkable(self, x0, y0, x1, y1):
+        return self.first_blocked(x0, y0, x1, y1) is None
@@ -0,0 +1,404 @@
+"""Mapa em pedaços: fundo e colisão lidos do disco conforme a câmera anda
+
+    python world.py                 # corta o background e a colisão em world/
+    python world.py --chunk 512
+
+O mapa vira uma pasta com world.json (tamanhos e origem), um PNG de fundo e
+um arquivo de colisão (zlib, um byte por pixel) para cada pedaço, mais a
+grade reduzida do flow field (nav.bin). No jogo, ChunkStreamer pede os
+pedaços em volta da câmera a uma thread, guarda os prontos num LRU com teto
+de memória e descarta os mais antigos quando o jogador se afasta.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from background import ChunkLayer, ChunkedBackground
+from flowfield import FlowField, walkable_cells
+from walkability import WalkabilityGrid
+
+MANIFEST = "world.json"
+VERSION = 1
+NAV_FILE = "nav.bin"
+
+
+def _chunk_file(kind, cx, cy):
+    return f"{kind}_{cx}_{cy}.{'png' if kind == 'fundo' else 'bin'}"
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class ChunkStreamer:
+    """Pedaços de fundo e colisão lidos por uma thread, num LRU com teto de memória
+
+    request(view) pede os pedaços que cruzam a área (coordenadas do mundo),
+    os mais perto do centro primeiro; poll() recolhe o que a thread terminou
+    e descarta os menos usados enquanto o cache passar de `max_bytes`. Os
+    pedaços do último request() nunca saem, mesmo acima do teto.
+
+    O fundo não espera: pedaço que ainda não chegou aparece na cor de espera.
+    A colisão não pode esperar (a simulação mudaria com a velocidade do
+    disco), então um pedaço que falta é lido na hora e conta em `stalls`.
+    """
+
+    def __init__(self, root, manifest, max_bytes, placeholder=(0, 0, 0), wrap=True):
+        self.root = root
+        self.manifest = manifest
+        self.width = manifest["width"]
+        self.height = manifest["height"]
+        self.chunk_size = manifest["chunk_size"]
+        self.cols = math.ceil(self.width / self.chunk_size)
+        self.rows = math.ceil(self.height / self.chunk_size)
+        self.max_bytes = max_bytes
+        self.placeholder = placeholder
+        self.wrap = wrap
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="mundo")
+        self._pending = {}
+        self._cache = OrderedDict()
+        self._pinned = set()
+        self._area = None
+        self._placeholders = {}
+        self.bytes = 0
+        self.loads = 0
+        self.evictions = 0
+        self.stalls = 0
+        self.background = StreamedBackground(self)
+        self.walkability = StreamedWalkability(self)
+
+    @classmethod
+    def open(cls, root, nav_cell_size, max_bytes, placeholder=(0, 0, 0), wrap=True):
+        """Abre o mapa; devolve None se ele não existir ou estiver desatualizado"""
+        path = os.path.join(root, MANIFEST)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            manifest = json.load(f)
+        if manifest.get("version") != VERSION or manifest["nav_cell_size"] != nav_cell_size:
+            print(f"AVISO: {root} gerado com outra versão - rode python world.py")
+            return None
+        # Fonte apagada não conta: o mapa pode ser distribuído só em pedaços
+        for source, stamp in manifest["sources"].items():
+            if os.path.exists(source) and _source_stamp(source) != stamp:
+                print(f"AVISO: {root} desatualizado ({source} mudou) - rode python world.py")
+                return None
+        return cls(root, manifest, max_bytes, placeholder, wrap)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def chunk_rect(self, cx, cy):
+        """(x, y, largura, altura) do pedaço no mapa; os da borda podem ser menores"""
+        x = cx * self.chunk_size
+        y = cy * self.chunk_size
+        return x, y, min(self.chunk_size, self.width - x), min(self.chunk_size, self.height - y)
+
+    def cover(self, left, top, right, bottom, wrap=None):
+        """Pedaços que cruzam a área: [(cx, cy, x, y no mundo)]
+
+        Com `wrap`, o mapa se repete fora das bordas e o mesmo pedaço pode
+        aparecer em mais de uma posição.
+        """
+        wrap = self.wrap if wrap is None else wrap
+        width, height, size = self.width, self.height, self.chunk_size
+        if wrap:
+            copies_x = range(math.floor(left / width), math.floor((right - 1) / width) + 1)
+            copies_y = range(math.floor(top / height), math.floor((bottom - 1) / height) + 1)
+        else:
+            copies_x = copies_y = (0,)
+        chunks = []
+        for ky in copies_y:
+            base_y = ky * height
+            cy0 = max(0, math.floor((top - base_y) / size))
+            cy1 = min(self.rows - 1, math.floor((bottom - 1 - base_y) / size))
+            for kx in copies_x:
+                base_x = kx * width
+                cx0 = max(0, math.floor((left - base_x) / size))
+                cx1 = min(self.cols - 1, math.floor((right - 1 - base_x) / size))
+                for cy in range(cy0, cy1 + 1):
+                    for cx in range(cx0, cx1 + 1):
+                        chunks.append((cx, cy, base_x + cx * size, base_y + cy * size))
+        return chunks
+
+    def request(self, view):
+        """Pede os pedaços da área (esquerda, topo, direita, base) que ainda faltam"""
+        left, top, right, bottom = view
+        size = self.chunk_size
+        area = (math.floor(left / size), math.floor(top / size),
+                math.floor(right / size), math.floor(bottom / size))
+        if area == self._area:
+            return
+        self._area = area
+
+        center_x = (left + right) / 2
+        center_y = (top + bottom) / 2
+        wanted = {}
+        for cx, cy, x, y in self.cover(left, top, right, bottom):
+            distance = (x + size / 2 - center_x) ** 2 + (y + size / 2 - center_y) ** 2
+            key = ("fundo", cx, cy)
+            wanted[key] = min(distance, wanted.get(key, distance))
+        # Fora do mapa nada é andável, então a colisão não se repete
+        for cx, cy, x, y in self.cover(left, top, right, bottom, wrap=False):
+            wanted[("colisao", cx, cy)] = (x + size / 2 - center_x) ** 2 + (y + size / 2 - center_y) ** 2
+
+        # O que saiu da área e a thread ainda nem começou é cancelado
+        for key, future in list(self._pending.items()):
+            if key not in wanted and future.cancel():
+                del self._pending[key]
+        self._pinned = set(wanted)
+        for key in sorted(wanted, key=wanted.get):
+            if key in self._cache:
+                self._cache.move_to_end(key)
+            elif key not in self._pending:
+                self._pending[key] = self._executor.submit(self._read, *key)
+
+    def _read(self, kind, cx, cy):
+        # Roda na thread: só disco e descompressão, nada que precise da janela
+        path = os.path.join(self.root, _chunk_file(kind, cx, cy))
+        if kind == "fundo":
+            return pygame.image.load(path)
+        with open(path, "rb") as f:
+            return zlib.decompress(f.read())
+
+    def _store(self, key, data):
+        if key[0] == "fundo":
+            if pygame.display.get_surface() is not None:
+                data = data.convert()
+            size = data.get_pitch() * data.get_height()
+        else:
+            size = len(data)
+        self._cache[key] = (data, size)
+        self.bytes += size
+        self.loads += 1
+        return data
+
+    def poll(self):
+        """Recolhe os pedaços prontos; devolve quantos de fundo chegaram"""
+        arrived = 0
+        for key, future in list(self._pending.items()):
+            if not future.done():
+                continue
+            del self._pending[key]
+            try:
+                self._store(key, future.result())
+            except Exception as e:
+                print(f"Erro ao carregar o pedaço {key}: {e}")
+                continue
+            if key[0] == "fundo":
+                arrived += 1
+        self._evict()
+        return arrived
+
+    def _evict(self):
+        if self.bytes <= self.max_bytes:
+            return
+        for key in list(self._cache):
+            if key in self._pinned:
+                continue
+            _, size = self._cache.pop(key)
+            self.bytes -= size
+            self.evictions += 1
+            if self.bytes <= self.max_bytes:
+                break
+
+    def background_chunk(self, cx, cy):
+        entry = self._cache.get(("fundo", cx, cy))
+        if entry is None:
+            return self.placeholder_for(cx, cy)
+        return entry[0]
+
+    def placeholder_for(self, cx, cy):
+        size = self.chunk_rect(cx, cy)[2:]
+        surf = self._placeholders.get(size)
+        if surf is None:
+            surf = pygame.Surface(size)
+            surf.fill(self.placeholder)
+            self._placeholders[size] = surf
+        return surf
+
+    def collision_chunk(self, cx, cy):
+        """Bytes 0/1 do pedaço; se ainda não chegou, lê na hora"""
+        key = ("colisao", cx, cy)
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            return entry[0]
+        self.stalls += 1
+        future = self._pending.pop(key, None)
+        if future is not None and not future.cancel():
+            data = future.result()
+        else:
+            data = self._read(*key)
+        data = self._store(key, data)
+        self._evict()
+        return data
+
+    def flow_field(self):
+        """FlowField sobre a grade reduzida gerada junto com os pedaços"""
+        manifest = self.manifest
+        with open(os.path.join(self.root, NAV_FILE), "rb") as f:
+            cells = zlib.decompress(f.read())
+        return FlowField.from_cells(manifest["nav_cols"], manifest["nav_rows"], cells,
+                                    manifest["nav_cell_size"])
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._pending.clear()
+
+
+class StreamedBackground(ChunkLayer):
+    """Fundo desenhado a partir dos pedaços que o ChunkStreamer já tem"""
+
+    def __init__(self, streamer):
+        self.streamer = streamer
+
+    def visible(self, offset_x, offset_y, width, height):
+        offset_x = math.floor(offset_x)
+        offset_y = math.floor(offset_y)
+        streamer = self.streamer
+        return [
+            (streamer.background_chunk(cx, cy), (x - offset_x, y - offset_y))
+            for cx, cy, x, y in streamer.cover(offset_x, offset_y, offset_x + width, offset_y + height)
+        ]
+
+
+class StreamedWalkability:
+    """Consultas do WalkabilityGrid sobre a colisão em pedaços
+
+    Não há as_array(): o mapa inteiro nunca fica na memória, e o flow field
+    sai do nav.bin (ChunkStreamer.flow_field).
+    """
+
+    def __init__(self, streamer):
+        self.streamer = streamer
+        self.width = streamer.width
+        self.height = streamer.height
+
+    def get_width(self):
+        return self.width
+
+    def get_height(self):
+        return self.height
+
+    def is_walkable(self, x, y):
+        x, y = int(x), int(y)
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        size = self.streamer.chunk_size
+        cx, cy = x // size, y // size
+        stride = min(size, self.width - cx * size)
+        return self.streamer.collision_chunk(cx, cy)[(y - cy * size) * stride + x - cx * size] == 1
+
+    def rect_walkable(self, x, y, width, height):
+        """True se todo o retângulo (canto superior esquerdo em x, y) é andável"""
+        x0, y0 = int(x), int(y)
+        x1, y1 = int(x + width), int(y + height)
+        if x0 < 0 or y0 < 0 or x1 >= self.width or y1 >= self.height:
+            return False
+        size = self.streamer.chunk_size
+        for cy in range(y0 // size, y1 // size + 1):
+            top = cy * size
+            rows = range(max(y0, top) - top, min(y1, top + size - 1) - top + 1)
+            for cx in range(x0 // size, x1 // size + 1):
+                left = cx * size
+                stride = min(size, self.width - left)
+                start, end = max(x0, left) - left, min(x1, left + size - 1) - left + 1
+                data = self.streamer.collision_chunk(cx, cy)
+                for row in rows:
+                    if 0 in data[row * stride + start:row * stride + end]:
+                        return False
+        return True
+
+    first_blocked = WalkabilityGrid.first_blocked
+    segment_walkable = WalkabilityGrid.segment_walkable
+
+
+def bake(background_path, collision_path, root, chunk_size, nav_cell_size, walkable_color=(0, 0, 0)):
+    """Corta o mapa em pedaços dentro de `root`; devolve o manifesto
+
+    O fundo é o `background_path` repetido sobre o tamanho do mapa de
+    colisão, do mesmo jeito que o jogo faz com o PNG inteiro.
+    """
+    if chunk_size % nav_cell_size:
+        raise ValueError(f"o pedaço ({chunk_size}) precisa ser múltiplo da célula do flow field "
+                         f"({nav_cell_size})")
+    grid = WalkabilityGrid.load(collision_path, walkable_color)
+    tiles = ChunkedBackground(pygame.image.load(background_path), (chunk_size, chunk_size))
+    width, height = grid.width, grid.height
+    cols = math.ceil(width / chunk_size)
+    rows = math.ceil(height / chunk_size)
+    nav_cols = width // nav_cell_size
+    nav_rows = height // nav_cell_size
+    nav = bytearray(nav_cols * nav_rows)
+    cells_per_chunk = chunk_size // nav_cell_size
+    os.makedirs(root, exist_ok=True)
+
+    for cy in range(rows):
+        for cx in range(cols):
+            x0, y0 = cx * chunk_size, cy * chunk_size
+            w, h = min(chunk_size, width - x0), min(chunk_size, height - y0)
+            pygame.image.save(tiles.chunk(cx, cy).subsurface(0, 0, w, h),
+                              os.path.join(root, _chunk_file("fundo", cx, cy)))
+
+            data = b"".join(grid.data[(y0 + row) * width + x0:(y0 + row) * width + x0 + w]
+                            for row in range(h))
+            with open(os.path.join(root, _chunk_file("colisao", cx, cy)), "wb") as f:
+                f.write(zlib.compress(data, 9))
+
+            # Como o pedaço é múltiplo da célula, reduzir pedaço a pedaço dá
+            # a mesma grade que reduzir o mapa inteiro
+            ccols, crows, cells = walkable_cells(WalkabilityGrid(w, h, data), nav_cell_size)
+            for row in range(crows):
+                start = (cy * cells_per_chunk + row) * nav_cols + cx * cells_per_chunk
+                nav[start:start + ccols] = cells[row * ccols:(row + 1) * ccols]
+
+    with open(os.path.join(root, NAV_FILE), "wb") as f:
+        f.write(zlib.compress(bytes(nav), 9))
+    manifest = {
+        "version": VERSION,
+        "width": width,
+        "height": height,
+        "chunk_size": chunk_size,
+        "nav_cell_size": nav_cell_size,
+        "nav_cols": nav_cols,
+        "nav_rows": nav_rows,
+        "sources": {path: _source_stamp(path) for path in (background_path, collision_path)},
+    }
+    with open(os.path.join(root, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Corta o mapa do Kodland Survival em pedaços")
+    parser.add_argument("--background", help="fundo (padrão: images/background.png)")
+    parser.add_argument("--collision", help="mapa de colisão (padrão: images/colisaobackground.png)")
+    parser.add_argument("--chunk", type=int, help="lado do pedaço em pixels (padrão: WORLD_CHUNK_SIZE)")
+    parser.add_argument("--output", help="pasta de saída (padrão: WORLD_DIR do main.py)")
+    args = parser.parse_args(argv)
+
+    import headless
+
+    mod = headless.load_game_module()
+    root = args.output or mod.WORLD_DIR
+    manifest = bake(args.background or os.path.join(mod.ASSETS.root, "background.png"),
+                    args.collision or mod.COLLISION_MAP_FILE,
+                    root, args.chunk or mod.WORLD_CHUNK_SIZE, mod.FLOW_FIELD_CELL_SIZE)
+    cols = math.ceil(manifest["width"] / manifest["chunk_size"])
+    rows = math.ceil(manifest["height"] / manifest["chunk_size"])
+    print(f"Mapa {manifest['width']}x{manifest['height']} salvo em {root}: "
+          f"{cols}x{rows} pedaços de {manifest['chunk_size']} px")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())